@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    """Картинки, которые mixer создаёт для ImageField, — во временной папке.
+
+    tests/ — тесты курса, их не правим, поэтому фикстура лежит в корне.
+    """
+    settings.MEDIA_ROOT = str(tmp_path)
@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import auth  # noqa: F401
+        from django.template import engines
+        for engine in engines.all():
+            if getattr(engine, 'precompile_on_start', False):
+                engine.precompile()
@@ -0,0 +1,36 @@
+"""Пользователь из кэша: тёплый запрос не читает auth_user.
+
+Любое сохранение пользователя, в том числе смена пароля, и удаление
+сбрасывают запись сигналами. Хеш сессии сверяется с паролем из
+кэша, так что после смены пароля старые сессии разлогиниваются.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+User = get_user_model()
+
+
+def user_key(user_id):
+    return f'auth-user:{user_id}'
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        key = user_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def expire_cached_user(sender, instance, **kwargs):
+    cache.delete(user_key(instance.pk))
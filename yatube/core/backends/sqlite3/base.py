@@ -0,0 +1,79 @@
+"""SQLite для продакшена: PRAGMA на каждое соединение и повтор при локе.
+
+Подключается как ENGINE 'core.backends.sqlite3'; настройки берутся из
+ключей PRAGMAS, LOCK_RETRIES и TRANSACTION_MODE в DATABASES.
+"""
+import random
+import time
+
+from django.db.backends.sqlite3 import base
+
+Database = base.Database
+
+LOCKED_MESSAGES = ('database is locked', 'database table is locked')
+
+
+def is_lock_error(error):
+    return isinstance(error, Database.OperationalError) and any(
+        message in str(error) for message in LOCKED_MESSAGES)
+
+
+def apply_pragmas(connection, pragmas):
+    for name, value in pragmas.items():
+        connection.execute(f'PRAGMA {name} = {value}')
+
+
+def retry_locked(execute, retries, backoff=0.01):
+    """Повторяет оператор вне транзакции, пока база занята.
+
+    Внутри транзакции повторять бесполезно: держатель лока может ждать
+    нас. Поэтому транзакции начинаются с BEGIN IMMEDIATE — ожидание
+    случается на BEGIN, который ещё вне транзакции и повторяется.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return execute()
+        except Database.OperationalError as error:
+            if attempt == retries or not is_lock_error(error):
+                raise
+        time.sleep(backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+
+
+class RetryingCursorWrapper(base.SQLiteCursorWrapper):
+    retries = 0
+
+    def execute(self, query, params=None):
+        execute = super().execute
+        if self.connection.in_transaction:
+            return execute(query, params)
+        return retry_locked(lambda: execute(query, params), self.retries)
+
+    def executemany(self, query, param_list):
+        executemany = super().executemany
+        if self.connection.in_transaction:
+            return executemany(query, param_list)
+        return retry_locked(
+            lambda: executemany(query, param_list), self.retries)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cursor_class = type(
+            'RetryingCursorWrapper', (RetryingCursorWrapper,),
+            {'retries': self.settings_dict.get('LOCK_RETRIES', 0)},
+        )
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        apply_pragmas(connection, self.settings_dict.get('PRAGMAS', {}))
+        return connection
+
+    def create_cursor(self, name=None):
+        return self.connection.cursor(factory=self.cursor_class)
+
+    def _start_transaction_under_autocommit(self):
+        # IMMEDIATE берёт лок записи сразу: отложенная транзакция,
+        # начавшаяся с чтения, получила бы SQLITE_BUSY без ожидания.
+        mode = self.settings_dict.get('TRANSACTION_MODE', '')
+        self.cursor().execute(f'BEGIN {mode}'.strip())
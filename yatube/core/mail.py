@@ -0,0 +1,108 @@
+"""Очередь исходящей почты в БД.
+
+OutboxEmailBackend не ходит на SMTP, а кладёт письма в OutgoingEmail:
+запрос сброса пароля отвечает сразу, сколько бы ни думал почтовый
+сервер. Команда send_outbox забирает письма пачками и отправляет их
+через EMAIL_OUTBOX_BACKEND по одному соединению на пачку; неудачные
+повторяются с экспоненциальной задержкой.
+"""
+import logging
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+logger = logging.getLogger('core.mail')
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        OutgoingEmail.objects.bulk_create([
+            OutgoingEmail.from_message(message)
+            for message in email_messages
+        ])
+        return len(email_messages)
+
+
+def retry_delay(attempts):
+    """Задержка перед следующей попыткой: растёт вдвое, с разбросом."""
+    base = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=base * random.uniform(0.5, 1.5))
+
+
+def claim(batch_size):
+    """Забирает пачку готовых писем, сдвигая их следующую попытку.
+
+    Сдвиг — аренда: второй воркер эти письма не возьмёт, а если этот
+    упадёт посреди пачки, они снова станут готовы к отправке.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        pks = list(OutgoingEmail.objects.select_for_update(
+            skip_locked=True
+        ).filter(
+            status=OutgoingEmail.PENDING, next_attempt__lte=now,
+        ).order_by('next_attempt', 'pk').values_list(
+            'pk', flat=True)[:batch_size])
+        OutgoingEmail.objects.filter(pk__in=pks).update(
+            next_attempt=now + timedelta(
+                seconds=settings.EMAIL_OUTBOX_LEASE))
+    return list(OutgoingEmail.objects.filter(pk__in=pks).order_by('pk'))
+
+
+def record_failure(email, error):
+    email.attempts += 1
+    email.last_error = f'{type(error).__name__}: {error}'
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = OutgoingEmail.FAILED
+    else:
+        email.next_attempt = timezone.now() + retry_delay(email.attempts)
+    email.save(update_fields=[
+        'attempts', 'last_error', 'status', 'next_attempt'])
+
+
+def deliver(email, connection):
+    try:
+        connection.send_messages([email.to_message()])
+    except Exception as error:
+        record_failure(email, error)
+        return False
+    email.attempts += 1
+    email.status = OutgoingEmail.SENT
+    email.sent = timezone.now()
+    email.save(update_fields=['attempts', 'status', 'sent'])
+    return True
+
+
+def send_batch(batch_size=None):
+    """Отправляет одну пачку; возвращает (отправлено, не отправлено)."""
+    emails = claim(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not emails:
+        return 0, 0
+    # Одно соединение на пачку: SMTP-рукопожатие и вход — один раз.
+    connection = get_connection(settings.EMAIL_OUTBOX_BACKEND)
+    try:
+        connection.open()
+    except Exception as error:
+        # Сервер недоступен — это неудачная попытка для каждого письма
+        # пачки, с той же задержкой и тем же пределом попыток.
+        logger.warning('Почтовый сервер недоступен: %s', error)
+        for email in emails:
+            record_failure(email, error)
+        return 0, len(emails)
+    sent = 0
+    try:
+        for email in emails:
+            sent += deliver(email, connection)
+    finally:
+        try:
+            connection.close()
+        except Exception as error:
+            logger.warning('Соединение с почтой не закрылось: %s', error)
+    return sent, len(emails) - sent
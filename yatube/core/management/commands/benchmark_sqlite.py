@@ -0,0 +1,146 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db import transaction
+from django.utils import timezone
+
+from posts.models import Post
+
+User = get_user_model()
+
+PROFILES = {
+    'default': {'ENGINE': 'django.db.backends.sqlite3'},
+    'production': settings.SQLITE_PRODUCTION_SETTINGS,
+}
+
+INSERT_SQL = (
+    'INSERT INTO posts_post (text, pub_date, updated, author_id, image) '
+    "VALUES (%s, %s, %s, %s, '')"
+)
+COUNTER_SQL = (
+    'UPDATE posts_postcounter SET count = count + 1 '
+    'WHERE scope = %s AND object_id = %s'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite в обычном и '
+        'продакшен-режиме: писатели повторяют запись post_create, '
+        'читатели — выборку главной страницы. Каждый режим работает '
+        'на своей копии текущей базы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument(
+            '--profiles', nargs='+', choices=PROFILES,
+            default=list(PROFILES))
+        parser.add_argument('--output', help='Файл JSON-отчёта.')
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError('Бенчмарк рассчитан на SQLite')
+        primary.ensure_connection()
+        directory = tempfile.mkdtemp()
+        report = {}
+        try:
+            for profile in options['profiles']:
+                path = os.path.join(directory, f'{profile}.sqlite3')
+                target = sqlite3.connect(path)
+                try:
+                    primary.connection.backup(target)
+                finally:
+                    target.close()
+                report[profile] = self.run_profile(profile, path, options)
+                self.stdout.write(
+                    f'{profile}: записей {report[profile]["writes_per_s"]}/с,'
+                    f' чтений {report[profile]["reads_per_s"]}/с, '
+                    f'ошибок лока {report[profile]["lock_errors"]}'
+                )
+        finally:
+            shutil.rmtree(directory)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+
+    def run_profile(self, profile, path, options):
+        alias = f'benchmark_{profile}'
+        connections.databases[alias] = {
+            **PROFILES[profile], 'NAME': path, 'CONN_MAX_AGE': None}
+        try:
+            author, _ = User.objects.using(alias).get_or_create(
+                username='benchmark')
+            connections[alias].close()
+            deadline = time.monotonic() + options['seconds']
+            results = []
+            threads = [
+                threading.Thread(
+                    target=self.worker,
+                    args=(self.write, alias, author.pk, deadline, results))
+                for _ in range(options['writers'])
+            ] + [
+                threading.Thread(
+                    target=self.worker,
+                    args=(self.read, alias, author.pk, deadline, results))
+                for _ in range(options['readers'])
+            ]
+            started = time.monotonic()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.monotonic() - started
+        finally:
+            del connections[alias]
+            del connections.databases[alias]
+        totals = {'write': 0, 'read': 0, 'errors': 0}
+        for kind, done, errors in results:
+            totals[kind] += done
+            totals['errors'] += errors
+        return {
+            'writes_per_s': round(totals['write'] / elapsed, 1),
+            'reads_per_s': round(totals['read'] / elapsed, 1),
+            'lock_errors': totals['errors'],
+        }
+
+    def worker(self, operation, alias, author_id, deadline, results):
+        done = errors = 0
+        try:
+            while time.monotonic() < deadline:
+                try:
+                    operation(alias, author_id)
+                    done += 1
+                except OperationalError:
+                    errors += 1
+        finally:
+            connections[alias].close()
+        kind = 'write' if operation == self.write else 'read'
+        results.append((kind, done, errors))
+
+    def write(self, alias, author_id):
+        connection = connections[alias]
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        with transaction.atomic(using=alias):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    INSERT_SQL, ['Пост бенчмарка', now, now, author_id])
+                cursor.execute(COUNTER_SQL, ['all', 0])
+
+    def read(self, alias, author_id):
+        list(
+            Post.objects.using(alias).select_related(
+                'author', 'group')[:settings.POST_LIMIT]
+        )
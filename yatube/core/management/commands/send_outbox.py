@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.mail import send_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди OutgoingEmail пачками через '
+        'EMAIL_OUTBOX_BACKEND, повторяя неудачные с задержкой.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не выходить, а ждать новых писем.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help='Пауза в секундах, когда очередь пуста (с --loop).'
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            close_old_connections()
+            sent, failed = send_batch(options['batch_size'])
+            total_sent += sent
+            total_failed += failed
+            if failed:
+                self.stderr.write(f'Не отправлено писем: {failed}')
+            # Полная пачка — очередь, скорее всего, не пуста.
+            if sent + failed < options['batch_size']:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        self.stdout.write(
+            f'Отправлено: {total_sent}, с ошибкой: {total_failed}')
@@ -0,0 +1,55 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+CHECKPOINT_MODES = ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE')
+
+
+def file_size(path):
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+class Command(BaseCommand):
+    help = (
+        'Обслуживание SQLite в режиме WAL: checkpoint журнала, '
+        'PRAGMA optimize и по желанию VACUUM.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            '--checkpoint', choices=CHECKPOINT_MODES, default='TRUNCATE',
+            help='TRUNCATE ещё и обрезает файл -wal до нуля.'
+        )
+        parser.add_argument(
+            '--vacuum', action='store_true',
+            help='Переписать базу целиком; на время блокирует запись.'
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда обслуживает только SQLite')
+        path = connection.settings_dict['NAME']
+        wal_path = f'{path}-wal'
+        with connection.cursor() as cursor:
+            wal_before = file_size(wal_path)
+            cursor.execute('PRAGMA optimize')
+            if options['vacuum']:
+                # VACUUM пишет всю базу через WAL, поэтому он идёт
+                # до checkpoint.
+                size_before = file_size(path)
+                cursor.execute('VACUUM')
+                self.stdout.write(
+                    f'VACUUM: {size_before} → {file_size(path)} байт')
+            cursor.execute(
+                f"PRAGMA wal_checkpoint({options['checkpoint']})")
+            busy, log, checkpointed = cursor.fetchone()
+        if busy:
+            self.stderr.write('Checkpoint не завершён: база занята читателями')
+        self.stdout.write(
+            f'Checkpoint {options["checkpoint"]}: страниц в WAL {log}, '
+            f'перенесено {checkpointed}; -wal {wal_before} → '
+            f'{file_size(wal_path)} байт'
+        )
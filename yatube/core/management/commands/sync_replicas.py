@@ -0,0 +1,37 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует primary SQLite в файлы реплик через backup API — '
+        'локальная замена настоящей репликации.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*',
+            help='Файлы реплик; по умолчанию — из DATABASE_REPLICAS.'
+        )
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or [
+            connections[alias].settings_dict['NAME']
+            for alias in settings.DATABASE_REPLICAS
+        ]
+        if not paths:
+            raise CommandError('Реплики не настроены: DATABASE_REPLICAS')
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError('Команда копирует только SQLite')
+        primary.ensure_connection()
+        for path in paths:
+            target = sqlite3.connect(path)
+            try:
+                primary.connection.backup(target)
+            finally:
+                target.close()
+            self.stdout.write(f'Реплика {path} обновлена')
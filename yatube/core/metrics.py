@@ -0,0 +1,178 @@
+import threading
+from bisect import bisect_left
+
+from django.conf import settings
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class ViewStats:
+    __slots__ = (
+        'requests', 'buckets', 'latency_sum', 'db_queries', 'db_seconds',
+        'template_seconds',
+    )
+
+    def __init__(self):
+        self.requests = {}
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+
+    def merge(self, other):
+        for key, value in other.requests.copy().items():
+            self.requests[key] = self.requests.get(key, 0) + value
+        for index, value in enumerate(other.buckets):
+            self.buckets[index] += value
+        self.latency_sum += other.latency_sum
+        self.db_queries += other.db_queries
+        self.db_seconds += other.db_seconds
+        self.template_seconds += other.template_seconds
+
+
+class MetricsRegistry:
+    """Метрики по view с агрегацией в памяти каждого потока.
+
+    Поток пишет только в свой словарь, без блокировок. Блокировка
+    берётся при первой записи нового потока и при сборе метрик, когда
+    статистика завершившихся потоков сворачивается в общий итог.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._threads = {}
+        self._retired = {}
+
+    def _stats(self):
+        stats = getattr(self._local, 'stats', None)
+        if stats is None:
+            stats = self._local.stats = {}
+            with self._lock:
+                self._threads[threading.current_thread()] = stats
+        return stats
+
+    def observe(self, view, method, status, latency, db_queries=0,
+                db_seconds=0.0, template_seconds=0.0):
+        stats = self._stats()
+        view_stats = stats.get(view)
+        if view_stats is None:
+            view_stats = stats[view] = ViewStats()
+        key = (method, status)
+        view_stats.requests[key] = view_stats.requests.get(key, 0) + 1
+        view_stats.buckets[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        view_stats.latency_sum += latency
+        view_stats.db_queries += db_queries
+        view_stats.db_seconds += db_seconds
+        view_stats.template_seconds += template_seconds
+
+    def collect(self):
+        """Сводные ViewStats по всем потокам."""
+        total = {}
+        with self._lock:
+            for thread in list(self._threads):
+                if not thread.is_alive():
+                    self._fold(self._retired, self._threads.pop(thread))
+            self._fold(total, self._retired)
+            for stats in self._threads.values():
+                self._fold(total, stats)
+        return total
+
+    @staticmethod
+    def _fold(target, stats):
+        for view, view_stats in stats.copy().items():
+            target.setdefault(view, ViewStats()).merge(view_stats)
+
+    def clear(self):
+        with self._lock:
+            self._threads.clear()
+            self._retired.clear()
+            self._local = threading.local()
+
+
+registry = MetricsRegistry()
+
+# Приложения добавляют свои метрики: функция возвращает строки
+# в формате Prometheus, включая # HELP и # TYPE.
+collectors = []
+
+
+def metrics_allowed(request):
+    """Можно ли показывать метрики этому клиенту: /metrics, Server-Timing."""
+    allowed = getattr(settings, 'METRICS_ALLOWED_IPS', ('127.0.0.1', '::1'))
+    return request.META.get('REMOTE_ADDR') in allowed
+
+
+def register_collector(collector):
+    if collector not in collectors:
+        collectors.append(collector)
+
+
+def escape_label(value):
+    return (
+        str(value).replace('\\', '\\\\').replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+def labels(**values):
+    return '{' + ','.join(
+        f'{name}="{escape_label(value)}"' for name, value in values.items()
+    ) + '}'
+
+
+def exposition(stats=None):
+    """Метрики в текстовом формате Prometheus."""
+    if stats is None:
+        stats = registry.collect()
+    views = sorted(stats.items())
+    lines = [
+        '# HELP yatube_http_requests_total Обработанные запросы.',
+        '# TYPE yatube_http_requests_total counter',
+    ]
+    for view, view_stats in views:
+        for (method, status), value in sorted(view_stats.requests.items()):
+            lines.append(
+                'yatube_http_requests_total'
+                f'{labels(view=view, method=method, status=status)} {value}'
+            )
+    lines += [
+        '# HELP yatube_http_request_duration_seconds Время ответа.',
+        '# TYPE yatube_http_request_duration_seconds histogram',
+    ]
+    for view, view_stats in views:
+        cumulative = 0
+        bounds = [str(bound) for bound in LATENCY_BUCKETS] + ['+Inf']
+        for bound, value in zip(bounds, view_stats.buckets):
+            cumulative += value
+            lines.append(
+                'yatube_http_request_duration_seconds_bucket'
+                f'{labels(view=view, le=bound)} {cumulative}'
+            )
+        lines.append(
+            'yatube_http_request_duration_seconds_sum'
+            f'{labels(view=view)} {view_stats.latency_sum}'
+        )
+        lines.append(
+            'yatube_http_request_duration_seconds_count'
+            f'{labels(view=view)} {cumulative}'
+        )
+    sums = (
+        ('yatube_db_queries_total', 'SQL-запросы.', 'db_queries'),
+        ('yatube_db_query_seconds_total', 'Время в SQL.', 'db_seconds'),
+        (
+            'yatube_template_render_seconds_total',
+            'Время рендера шаблонов.',
+            'template_seconds',
+        ),
+    )
+    for name, help_text, attr in sums:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for view, view_stats in views:
+            lines.append(
+                f'{name}{labels(view=view)} {getattr(view_stats, attr)}')
+    for collector in collectors:
+        lines += collector()
+    return '\n'.join(lines) + '\n'
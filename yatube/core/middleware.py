@@ -0,0 +1,150 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .metrics import metrics_allowed, registry
+from .queries import QueryRecorder, QueryTimer, query_budget
+from .routers import (
+    PIN_COOKIE, end_request, replica_aliases, start_request, use_replica)
+from .staticfiles import serve_static
+from .template_backends import render_time, reset_render_time
+
+logger = logging.getLogger('core.queries')
+
+
+class QueryBudgetMiddleware:
+    """Считает запросы каждого запроса и ругается на N+1 и бюджеты.
+
+    Включается настройкой QUERY_INSPECTION (по умолчанию — при DEBUG).
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSPECTION', settings.DEBUG):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with recorder.record():
+            response = self.get_response(request)
+        response['X-Query-Count'] = str(len(recorder))
+        match = request.resolver_match
+        view_name = match.view_name if match else request.path
+        budget = query_budget(view_name, request.method)
+        if budget is not None and len(recorder) > budget:
+            logger.warning(
+                'Бюджет запросов %s превышен: %s > %s\n%s',
+                view_name, len(recorder), budget, recorder.report())
+        elif recorder.repeated():
+            logger.warning(
+                'Похоже на N+1 в %s\n%s', view_name, recorder.report())
+        return response
+
+
+class MetricsMiddleware:
+    """Собирает метрики запроса с меткой request.resolver_match.view_name.
+
+    Ставится первым в MIDDLEWARE, чтобы время ответа включало остальные
+    middleware. Отключается настройкой METRICS_ENABLED = False.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        reset_render_time()
+        started = time.perf_counter()
+        with timer.record():
+            response = self.get_response(request)
+        latency = time.perf_counter() - started
+        template_seconds = render_time()
+        # Время view без рендера шаблонов видно прямо в DevTools, но
+        # только разработчику и своим адресам: чужим тайминги подсказали
+        # бы, какие запросы дороже всего.
+        if settings.DEBUG or metrics_allowed(request):
+            response['Server-Timing'] = ', '.join([
+                f'view;dur={(latency - template_seconds) * 1000:.1f}',
+                f'template;dur={template_seconds * 1000:.1f}',
+                f'db;dur={timer.seconds * 1000:.1f}',
+            ])
+        match = request.resolver_match
+        registry.observe(
+            view=match.view_name if match else 'unmatched',
+            method=request.method,
+            status=response.status_code,
+            latency=latency,
+            db_queries=timer.count,
+            db_seconds=timer.seconds,
+            template_seconds=template_seconds,
+        )
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """Пускает GET-запросы view из DATABASE_REPLICA_VIEWS на реплики.
+
+    Запрос, который что-то записал, ставит cookie: следующие
+    DATABASE_PIN_SECONDS секунд браузер читает только с primary, и
+    редирект после post_create уже видит новый пост. Без реплик в
+    DATABASE_REPLICAS middleware отключается.
+    """
+
+    def __init__(self, get_response):
+        if not replica_aliases():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = end_request()
+        if wrote:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=settings.DATABASE_PIN_SECONDS,
+                httponly=True,
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            request.method in ('GET', 'HEAD')
+            and PIN_COOKIE not in request.COOKIES
+            and request.resolver_match.view_name
+            in settings.DATABASE_REPLICA_VIEWS
+        ):
+            use_replica()
+
+
+class StaticFilesMiddleware:
+    """Отдаёт собранную статику из STATIC_ROOT в обход остальных middleware.
+
+    Ставится сразу после SecurityMiddleware. Файлы с хешем в имени
+    кэшируются навсегда, а при Accept-Encoding: gzip отдаётся готовая
+    копия .gz — на запрос ничего не сжимается. Включается настройкой
+    STATIC_SERVE; в разработке статику отдаёт runserver.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'STATIC_SERVE', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        prefix = settings.STATIC_URL
+        if (
+            request.method in ('GET', 'HEAD')
+            and settings.STATIC_ROOT
+            and request.path_info.startswith(prefix)
+        ):
+            response = serve_static(request, request.path_info[len(prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:43
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingEmail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message', models.BinaryField()),
+                ('subject', models.CharField(max_length=255, verbose_name='Тема')),
+                ('recipients', models.TextField(verbose_name='Получатели')),
+                ('status', models.CharField(choices=[('pending', 'Ждёт отправки'), ('sent', 'Отправлено'), ('failed', 'Не отправлено')], default='pending', max_length=7)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('sent', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='outgoingemail',
+            index=models.Index(fields=['status', 'next_attempt'], name='outbox_due_idx'),
+        ),
+    ]
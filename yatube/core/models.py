@@ -0,0 +1,55 @@
+import pickle
+
+from django.db import models
+from django.utils import timezone
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди отправки, см. core.mail."""
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Ждёт отправки'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не отправлено'),
+    )
+
+    # EmailMessage целиком, с вложениями и HTML-версией. Пишет его
+    # только OutboxEmailBackend, так что pickle здесь безопасен.
+    message = models.BinaryField()
+    subject = models.CharField('Тема', max_length=255)
+    recipients = models.TextField('Получатели')
+    status = models.CharField(
+        max_length=7, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    sent = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.subject} → {self.recipients}'
+
+    @classmethod
+    def from_message(cls, message):
+        # Соединение отправителя не сериализуется и воркеру не нужно.
+        message.connection = None
+        return cls(
+            message=pickle.dumps(message),
+            subject=str(message.subject)[:255],
+            recipients=', '.join(message.recipients()),
+        )
+
+    def to_message(self):
+        return pickle.loads(bytes(self.message))
+
+    class Meta:
+        # Воркер выбирает готовые к отправке письма по этому индексу.
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt'],
+                name='outbox_due_idx',
+            ),
+        ]
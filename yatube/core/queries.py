@@ -0,0 +1,133 @@
+import os
+import re
+import sys
+import time
+from collections import defaultdict, namedtuple
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+RecordedQuery = namedtuple('RecordedQuery', 'sql duration location')
+
+IN_LIST = re.compile(r'\((?:%s, )+%s\)')
+THIS_FILE = os.path.abspath(__file__)
+# Постоянные execute_wrapper приложений стоят в стеке между запросом
+# и вызвавшим его кодом — местом запроса они не считаются.
+WRAPPER_CODE = set()
+
+
+def location_transparent(wrapper):
+    WRAPPER_CODE.add(wrapper.__code__)
+    return wrapper
+
+
+@contextmanager
+def wrap_connections(wrapper):
+    """Подключает execute_wrapper ко всем соединениям с базами."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield wrapper
+
+
+def query_shape(sql):
+    """SQL без различий в длине IN (...): одинаковые запросы — одна форма."""
+    return IN_LIST.sub('(%s, ...)', sql)
+
+
+def query_location():
+    """Откуда выполнен запрос: строка шаблона или код проекта."""
+    frame = sys._getframe(2)
+    code_location = None
+    while frame is not None:
+        node = frame.f_locals.get('self')
+        if (
+            frame.f_code.co_name == 'render_annotated'
+            and getattr(node, 'origin', None) is not None
+            and getattr(node, 'token', None) is not None
+        ):
+            return f'{node.origin.template_name}:{node.token.lineno}'
+        filename = frame.f_code.co_filename
+        if (
+            code_location is None
+            and filename.startswith(settings.BASE_DIR)
+            and filename != THIS_FILE
+            and frame.f_code not in WRAPPER_CODE
+        ):
+            code_location = (
+                f'{os.path.relpath(filename, settings.BASE_DIR)}:'
+                f'{frame.f_lineno} ({frame.f_code.co_name})'
+            )
+        frame = frame.f_back
+    return code_location or '?'
+
+
+class QueryRecorder:
+    """Записывает SQL-запросы через execute_wrapper всех подключений."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(RecordedQuery(
+                sql, time.perf_counter() - started, query_location()))
+
+    def record(self):
+        return wrap_connections(self)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def repeated(self, threshold=None):
+        """Формы запросов, выполненные threshold и более раз (N+1)."""
+        if threshold is None:
+            threshold = getattr(settings, 'QUERY_N_PLUS_ONE_THRESHOLD', 3)
+        shapes = defaultdict(list)
+        for query in self.queries:
+            shapes[query_shape(query.sql)].append(query)
+        return {
+            shape: queries for shape, queries in shapes.items()
+            if len(queries) >= threshold
+        }
+
+    def report(self):
+        lines = [f'Запросов: {len(self.queries)}']
+        for query in self.queries:
+            lines.append(f'  [{query.location}] {query.sql}')
+        for shape, queries in self.repeated().items():
+            locations = sorted({query.location for query in queries})
+            lines.append(
+                f'N+1: {len(queries)} раз из {", ".join(locations)}: {shape}')
+        return '\n'.join(lines)
+
+
+class QueryTimer:
+    """Лёгкий execute_wrapper: только число и суммарное время запросов."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+    def record(self):
+        return wrap_connections(self)
+
+
+def query_budget(view_name, method='GET'):
+    """Бюджет view: число или словарь по методам, {'GET': 3, 'POST': 9}."""
+    budget = getattr(settings, 'QUERY_BUDGETS', {}).get(view_name)
+    if isinstance(budget, dict):
+        return budget.get(method)
+    return budget
@@ -0,0 +1,64 @@
+import random
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'db_pin'
+
+_state = threading.local()
+
+
+def replica_aliases():
+    return tuple(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+def start_request():
+    _state.replica = None
+    _state.wrote = False
+
+
+def use_replica():
+    """Выбирает реплику на весь запрос, чтобы чтения были согласованы."""
+    aliases = replica_aliases()
+    _state.replica = random.choice(aliases) if aliases else None
+
+
+def mark_written():
+    """Отмечает запись, сделанную в обход роутера этого потока."""
+    _state.wrote = True
+
+
+def end_request():
+    """Сбрасывает состояние потока; True, если запрос что-то записал."""
+    wrote = getattr(_state, 'wrote', False)
+    _state.replica = None
+    _state.wrote = False
+    return wrote
+
+
+class PrimaryReplicaRouter:
+    """Чтения разрешённых view идут на реплику, всё остальное — на primary.
+
+    Реплику включает ReplicaRoutingMiddleware. Вне запроса (команды,
+    shell, тесты) и после первой записи в запросе всё читается с
+    primary: так запрос видит то, что сам записал.
+    """
+
+    def db_for_read(self, model, **hints):
+        replica = getattr(_state, 'replica', None)
+        if replica is None or getattr(_state, 'wrote', False):
+            return DEFAULT_DB_ALIAS
+        return replica
+
+    def db_for_write(self, model, **hints):
+        mark_written()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На репликах те же данные, что и на primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема попадает на реплику вместе с копией базы.
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,46 @@
+"""Сессии в кэше с записью в БД, которые пишутся только при изменении.
+
+Основа — cached_db: тёплый запрос берёт сессию из кэша и не читает
+django_session. SessionMiddleware сохраняет сессию при любом
+присваивании, даже того же значения; здесь такая запись пропускается.
+
+Включается вместе с CachedModelBackend и только с общим кэшем, см.
+SHARED_CACHE в настройках.
+"""
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.contrib.sessions.backends import cached_db
+
+MODEL_BACKEND = 'django.contrib.auth.backends.ModelBackend'
+CACHED_BACKEND = 'core.auth.CachedModelBackend'
+
+
+class SessionStore(cached_db.SessionStore):
+    _saved_state = None
+
+    def state(self, session):
+        return self.serializer().dumps(session)
+
+    def load(self):
+        session = super().load()
+        # Сессии, выданные до включения кэша, переводятся на
+        # CachedModelBackend: держать ModelBackend в списке нельзя —
+        # неверный пароль проверялся бы обоими бэкендами.
+        if (
+            session.get(BACKEND_SESSION_KEY) == MODEL_BACKEND
+            and CACHED_BACKEND in settings.AUTHENTICATION_BACKENDS
+        ):
+            session[BACKEND_SESSION_KEY] = CACHED_BACKEND
+        self._saved_state = self.state(session)
+        return session
+
+    def save(self, must_create=False):
+        state = self.state(self._get_session(no_load=must_create))
+        if (
+            not must_create
+            and self.session_key is not None
+            and state == self._saved_state
+        ):
+            return
+        super().save(must_create=must_create)
+        self._saved_state = state
@@ -0,0 +1,80 @@
+import os
+import threading
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.template import TemplateDoesNotExist, TemplateSyntaxError
+from django.template.backends.django import (
+    DjangoTemplates, Template, reraise
+)
+
+_state = threading.local()
+
+
+def reset_render_time():
+    _state.seconds = 0.0
+    _state.depth = 0
+
+
+def render_time():
+    """Сколько секунд текущий поток рендерил шаблоны с последнего сброса."""
+    return getattr(_state, 'seconds', 0.0)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        depth = getattr(_state, 'depth', 0)
+        _state.depth = depth + 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            _state.depth = depth
+            # Вложенный render_to_string уже входит во внешний рендер.
+            if depth == 0:
+                _state.seconds = (
+                    render_time() + time.perf_counter() - started)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Бэкенд DjangoTemplates, который замеряет время рендера.
+
+    С OPTIONS['precompile'] = True и кэширующим загрузчиком
+    precompile() разбирает при старте все шаблоны из DIRS.
+    """
+
+    def __init__(self, params):
+        params = params.copy()
+        options = params['OPTIONS'] = params.get('OPTIONS', {}).copy()
+        self.precompile_on_start = options.pop('precompile', False)
+        super().__init__(params)
+
+    def template_names(self):
+        for directory in self.engine.dirs:
+            for root, _, files in os.walk(directory):
+                for name in sorted(files):
+                    yield os.path.relpath(
+                        os.path.join(root, name), directory
+                    ).replace(os.sep, '/')
+
+    def precompile(self):
+        """Компилирует шаблоны в кэш загрузчика; ошибка роняет запуск."""
+        names = list(self.template_names())
+        for name in names:
+            try:
+                self.engine.get_template(name)
+            except TemplateSyntaxError as error:
+                raise ImproperlyConfigured(
+                    f'Шаблон {name} не компилируется: {error}'
+                ) from error
+        return names
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(
+                self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -0,0 +1,27 @@
+from urllib.parse import urlsplit
+
+from django.urls import resolve
+
+from .queries import QueryRecorder, query_budget
+
+
+class QueryBudgetTestMixin:
+    """Проверки для TestCase: бюджет запросов view и отсутствие N+1."""
+
+    def assertWithinQueryBudget(self, client, url, data=None, method='GET'):
+        view_name = resolve(urlsplit(url).path).view_name
+        budget = query_budget(view_name, method)
+        self.assertIsNotNone(
+            budget,
+            f'Для {method} {view_name} не задан бюджет в QUERY_BUDGETS')
+        recorder = QueryRecorder()
+        with recorder.record():
+            response = getattr(client, method.lower())(url, data)
+        self.assertLessEqual(
+            len(recorder), budget,
+            f'{method} {view_name}: бюджет {budget}\n{recorder.report()}'
+        )
+        self.assertFalse(
+            recorder.repeated(),
+            f'{method} {view_name}: N+1\n{recorder.report()}')
+        return response
@@ -0,0 +1,144 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..mail import send_batch
+from ..models import OutgoingEmail
+
+User = get_user_model()
+
+LOCMEM = 'django.core.mail.backends.locmem.EmailBackend'
+COUNTING = 'core.tests.test_mail.CountingBackend'
+FAILING = 'core.tests.test_mail.FailingBackend'
+UNREACHABLE = 'core.tests.test_mail.UnreachableBackend'
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+
+class FailingBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionRefusedError('SMTP недоступен')
+
+
+class UnreachableBackend(EmailBackend):
+    def open(self):
+        raise ConnectionRefusedError('Соединение отклонено')
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.OutboxEmailBackend',
+    EMAIL_OUTBOX_BACKEND=LOCMEM,
+    EMAIL_OUTBOX_MAX_ATTEMPTS=2,
+)
+class OutboxTests(TestCase):
+    def setUp(self):
+        User.objects.create_user(
+            username='auth', email='auth@example.com', password='secret')
+
+    def request_reset(self):
+        return Client().post(
+            reverse('users:password_reset_form'),
+            {'email': 'auth@example.com'},
+        )
+
+    def test_password_reset_is_queued_not_sent(self):
+        response = self.request_reset()
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(mail.outbox, [])
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.status, OutgoingEmail.PENDING)
+        self.assertEqual(email.recipients, 'auth@example.com')
+
+    def test_worker_sends_queued_mail(self):
+        self.request_reset()
+
+        call_command('send_outbox', stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['auth@example.com'])
+        self.assertIn('/reset/', mail.outbox[0].body)
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.status, OutgoingEmail.SENT)
+        self.assertIsNotNone(email.sent)
+
+    @override_settings(EMAIL_OUTBOX_BACKEND=COUNTING)
+    def test_batch_reuses_one_connection(self):
+        for _ in range(3):
+            self.request_reset()
+        CountingBackend.opened = 0
+
+        self.assertEqual(send_batch(batch_size=10), (3, 0))
+
+        self.assertEqual(CountingBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 3)
+
+    @override_settings(EMAIL_OUTBOX_BACKEND=FAILING)
+    def test_failed_mail_is_retried_with_backoff_then_given_up(self):
+        self.request_reset()
+
+        self.assertEqual(send_batch(), (0, 1))
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.status, OutgoingEmail.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertIn('SMTP недоступен', email.last_error)
+        self.assertGreater(email.next_attempt, timezone.now())
+        # До конца задержки письмо не берётся.
+        self.assertEqual(send_batch(), (0, 0))
+
+        OutgoingEmail.objects.update(
+            next_attempt=timezone.now() - timedelta(seconds=1))
+        send_batch()
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.FAILED)
+        self.assertEqual(email.attempts, 2)
+
+    @override_settings(EMAIL_OUTBOX_BACKEND=UNREACHABLE)
+    def test_unreachable_server_counts_as_failed_attempt(self):
+        self.request_reset()
+        self.request_reset()
+        output = StringIO()
+
+        with self.assertLogs('core.mail', 'WARNING'):
+            call_command('send_outbox', stdout=output, stderr=StringIO())
+
+        self.assertIn('с ошибкой: 2', output.getvalue())
+        for email in OutgoingEmail.objects.all():
+            self.assertEqual(email.status, OutgoingEmail.PENDING)
+            self.assertEqual(email.attempts, 1)
+            self.assertIn('Соединение отклонено', email.last_error)
+            self.assertGreater(email.next_attempt, timezone.now())
+
+    def test_file_backend_writes_messages(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.request_reset()
+
+        with self.settings(
+            EMAIL_OUTBOX_BACKEND=(
+                'django.core.mail.backends.filebased.EmailBackend'),
+            EMAIL_FILE_PATH=directory,
+        ):
+            send_batch()
+
+        files = os.listdir(directory)
+        self.assertEqual(len(files), 1)
+        with open(os.path.join(directory, files[0])) as message:
+            self.assertIn('To: auth@example.com', message.read())
@@ -0,0 +1,60 @@
+import threading
+
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..metrics import MetricsRegistry, registry
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        registry.clear()
+        self.guest_client = Client()
+
+    def test_metrics_are_labelled_by_view_name(self):
+        self.guest_client.get(reverse('posts:index'))
+        self.guest_client.get(reverse('about:author'))
+        response = self.guest_client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        expected = (
+            'yatube_http_requests_total{view="posts:index",method="GET",'
+            'status="200"} 1',
+            'yatube_http_request_duration_seconds_count'
+            '{view="about:author"} 1',
+            'yatube_db_queries_total{view="posts:index"}',
+            'yatube_template_render_seconds_total{view="about:author"}',
+        )
+        for line in expected:
+            with self.subTest(line=line):
+                self.assertIn(line, body)
+
+    def test_metrics_hidden_from_other_addresses(self):
+        response = self.guest_client.get('/metrics', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 404)
+
+    def test_server_timing_hidden_from_other_addresses(self):
+        url = reverse('about:author')
+        self.assertTrue(self.guest_client.get(url).has_header('Server-Timing'))
+        response = self.guest_client.get(url, REMOTE_ADDR='10.0.0.1')
+        self.assertFalse(response.has_header('Server-Timing'))
+        with self.settings(DEBUG=True):
+            response = self.guest_client.get(url, REMOTE_ADDR='10.0.0.1')
+        self.assertTrue(response.has_header('Server-Timing'))
+
+    def test_per_thread_stats_survive_thread_exit(self):
+        metrics = MetricsRegistry()
+
+        def work():
+            for _ in range(100):
+                metrics.observe('posts:index', 'GET', 200, 0.02)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for _ in range(2):
+            stats = metrics.collect()['posts:index']
+            self.assertEqual(stats.requests[('GET', 200)], 400)
+            self.assertEqual(sum(stats.buckets), 400)
@@ -0,0 +1,94 @@
+import os
+import sqlite3
+import tempfile
+from io import StringIO
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import resolve, reverse
+
+from posts.models import Post
+
+from ..middleware import ReplicaRoutingMiddleware
+from ..routers import PIN_COOKIE
+
+
+@override_settings(DATABASE_REPLICAS=('replica1',))
+class ReplicaRoutingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.INDEX_URL = reverse('posts:index')
+        cls.SEARCH_URL = reverse('posts:search')
+        cls.POST_CREATE_URL = reverse('posts:post_create')
+
+    def route(self, path, method='get', cookies=None, write=False):
+        """Прогоняет запрос через middleware; возвращает алиас чтения."""
+        seen = {}
+
+        def view(request):
+            middleware.process_view(request, view, (), {})
+            if write:
+                router.db_for_write(Post)
+            seen['alias'] = router.db_for_read(Post)
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(view)
+        request = getattr(RequestFactory(), method)(path)
+        request.resolver_match = resolve(path)
+        request.COOKIES.update(cookies or {})
+        response = middleware(request)
+        return seen['alias'], response
+
+    def test_listed_get_views_read_from_replica(self):
+        alias, response = self.route(self.INDEX_URL)
+        self.assertEqual(alias, 'replica1')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_other_views_and_methods_use_primary(self):
+        self.assertEqual(self.route(self.SEARCH_URL)[0], 'default')
+        self.assertEqual(
+            self.route(self.POST_CREATE_URL, method='post')[0], 'default')
+
+    def test_write_pins_reader_to_primary(self):
+        alias, response = self.route(
+            self.POST_CREATE_URL, method='post', write=True)
+        self.assertEqual(alias, 'default')
+        self.assertIn(PIN_COOKIE, response.cookies)
+        alias, _ = self.route(self.INDEX_URL, cookies={PIN_COOKIE: '1'})
+        self.assertEqual(alias, 'default')
+
+    def test_reads_after_write_in_same_request_use_primary(self):
+        alias, response = self.route(self.INDEX_URL, write=True)
+        self.assertEqual(alias, 'default')
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+    def test_outside_request_reads_from_primary(self):
+        self.route(self.INDEX_URL)
+        self.assertEqual(router.db_for_read(Post), 'default')
+
+    @override_settings(DATABASE_REPLICAS=())
+    def test_middleware_is_off_without_replicas(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ReplicaRoutingMiddleware(HttpResponse)
+
+
+class SyncReplicasCommandTests(TestCase):
+    def test_replica_file_gets_primary_schema(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'replica.sqlite3')
+        self.addCleanup(os.rmdir, directory)
+        self.addCleanup(os.remove, path)
+        call_command('sync_replicas', path, stdout=StringIO())
+        replica = sqlite3.connect(path)
+        try:
+            tables = {
+                name for name, in replica.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'")
+            }
+        finally:
+            replica.close()
+        self.assertIn(Post._meta.db_table, tables)
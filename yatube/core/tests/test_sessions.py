@@ -0,0 +1,96 @@
+from django.contrib.auth import authenticate, get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..auth import user_key
+from ..sessions import CACHED_BACKEND, SessionStore
+
+User = get_user_model()
+
+
+class SessionStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        session = SessionStore()
+        session['theme'] = 'dark'
+        session.create()
+        self.session_key = session.session_key
+
+    def test_unchanged_session_is_not_written(self):
+        session = SessionStore(self.session_key)
+        session['theme'] = 'dark'
+
+        with self.assertNumQueries(0):
+            session.save()
+
+    def test_changed_session_is_written_through(self):
+        session = SessionStore(self.session_key)
+        session['theme'] = 'light'
+        session.save()
+        cache.clear()
+
+        self.assertEqual(SessionStore(self.session_key)['theme'], 'light')
+
+
+@override_settings(
+    SESSION_ENGINE='core.sessions',
+    AUTHENTICATION_BACKENDS=[CACHED_BACKEND],
+)
+class CachedUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='auth', password='old-password')
+        self.client = Client()
+        self.client.login(username='auth', password='old-password')
+        self.url = reverse('about:author')
+
+    def test_warm_request_runs_no_auth_queries(self):
+        self.client.get(self.url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.context['user'], self.user)
+        self.assertEqual(len(queries), 0, queries.captured_queries)
+
+    def test_user_change_expires_cached_user(self):
+        self.client.get(self.url)
+        self.assertIsNotNone(cache.get(user_key(self.user.pk)))
+
+        self.user.first_name = 'Лев'
+        self.user.save()
+
+        self.assertIsNone(cache.get(user_key(self.user.pk)))
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['user'].first_name, 'Лев')
+
+    def test_password_change_logs_out_other_sessions(self):
+        self.client.get(self.url)
+
+        self.user.set_password('new-password')
+        self.user.save()
+
+        response = self.client.get(self.url)
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_wrong_password_is_checked_once(self):
+        with self.assertNumQueries(1):
+            self.assertIsNone(
+                authenticate(username='auth', password='wrong'))
+
+    def test_session_from_model_backend_stays_valid(self):
+        client = Client()
+        with self.settings(
+            SESSION_ENGINE='django.contrib.sessions.backends.db',
+            AUTHENTICATION_BACKENDS=[
+                'django.contrib.auth.backends.ModelBackend'],
+        ):
+            client.login(username='auth', password='old-password')
+
+        response = client.get(self.url)
+
+        self.assertEqual(response.context['user'], self.user)
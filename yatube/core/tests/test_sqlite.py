@@ -0,0 +1,113 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import OperationalError, connections
+from django.test import TestCase
+
+ALIAS = 'sqlite_production_test'
+
+
+class ProductionSQLiteTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'db.sqlite3')
+        with sqlite3.connect(self.path) as raw:
+            raw.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+
+    def connect(self, **overrides):
+        connections.databases[ALIAS] = {
+            **settings.SQLITE_PRODUCTION_SETTINGS,
+            'NAME': self.path,
+            **overrides,
+        }
+        self.addCleanup(connections.databases.pop, ALIAS)
+        self.addCleanup(connections.__delitem__, ALIAS)
+        self.addCleanup(connections[ALIAS].close)
+        return connections[ALIAS]
+
+    def hold_write_lock(self, seconds):
+        """Чужой писатель держит лок и отпускает его через seconds."""
+        raw = sqlite3.connect(self.path, check_same_thread=False)
+        raw.execute('BEGIN IMMEDIATE')
+        timer = threading.Timer(seconds, raw.commit)
+        timer.start()
+        self.addCleanup(raw.close)
+        self.addCleanup(timer.join)
+
+    def test_pragmas_are_applied_per_connection(self):
+        connection = self.connect()
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+
+    def test_locked_statement_is_retried(self):
+        connection = self.connect(
+            OPTIONS={'timeout': 0.01},
+            PRAGMAS={'busy_timeout': 10},
+            LOCK_RETRIES=10,
+        )
+        connection.ensure_connection()
+        self.hold_write_lock(0.2)
+        with connection.cursor() as cursor:
+            cursor.execute('INSERT INTO item DEFAULT VALUES')
+            cursor.execute('SELECT COUNT(*) FROM item')
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+    def test_lock_error_surfaces_after_retries(self):
+        connection = self.connect(
+            OPTIONS={'timeout': 0.01},
+            PRAGMAS={'busy_timeout': 10},
+            LOCK_RETRIES=0,
+        )
+        connection.ensure_connection()
+        self.hold_write_lock(0.2)
+        with self.assertRaises(OperationalError):
+            with connection.cursor() as cursor:
+                cursor.execute('INSERT INTO item DEFAULT VALUES')
+
+    def test_maintenance_checkpoints_wal(self):
+        connection = self.connect()
+        with connection.cursor() as cursor:
+            cursor.execute('INSERT INTO item DEFAULT VALUES')
+        output = StringIO()
+        call_command(
+            'sqlite_maintenance', database=ALIAS, vacuum=True,
+            stdout=output, stderr=StringIO(),
+        )
+        self.assertIn('Checkpoint TRUNCATE', output.getvalue())
+        self.assertEqual(os.path.getsize(f'{self.path}-wal'), 0)
+
+
+class BenchmarkSQLiteCommandTests(TestCase):
+    def test_benchmark_reports_both_profiles(self):
+        output = StringIO()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        report_path = os.path.join(directory, 'report.json')
+        call_command(
+            'benchmark_sqlite', seconds=0.2, writers=1, readers=1,
+            output=report_path, stdout=output,
+        )
+        lines = output.getvalue().splitlines()
+        self.assertEqual(
+            [line.split(':')[0] for line in lines],
+            ['default', 'production']
+        )
+        with open(report_path) as report_file:
+            report = json.load(report_file)
+        for profile, result in report.items():
+            with self.subTest(profile=profile):
+                self.assertGreater(result['writes_per_s'], 0)
+                self.assertGreater(result['reads_per_s'], 0)
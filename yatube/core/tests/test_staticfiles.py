@@ -0,0 +1,101 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+
+from ..staticfiles import IMMUTABLE, REVALIDATE
+
+STORAGE = 'core.staticfiles.CompressedManifestStaticFilesStorage'
+
+
+class StaticFilesTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(
+            STATIC_ROOT=cls.static_root,
+            STATICFILES_STORAGE=STORAGE,
+            STATIC_SERVE=True,
+        )
+        cls.settings_override.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+        cls.css = staticfiles_storage.stored_name('css/bootstrap.min.css')
+        cls.logo = staticfiles_storage.stored_name('img/logo.png')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        shutil.rmtree(cls.static_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def get(self, name, **headers):
+        return Client().get(f'/static/{name}', **headers)
+
+    def test_collectstatic_writes_hashed_and_gzipped_files(self):
+        self.assertRegex(self.css, r'^css/bootstrap\.min\.[0-9a-f]{12}\.css$')
+        path = os.path.join(self.static_root, self.css)
+        with open(path, 'rb') as source, gzip.open(f'{path}.gz') as packed:
+            self.assertEqual(packed.read(), source.read())
+        self.assertFalse(
+            os.path.exists(os.path.join(self.static_root, f'{self.logo}.gz')))
+
+    def test_gzip_variant_served_when_accepted(self):
+        response = self.get(self.css, HTTP_ACCEPT_ENCODING='gzip, br')
+        body = b''.join(response.streaming_content)
+        response.close()
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Cache-Control'], IMMUTABLE)
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertTrue(gzip.decompress(body).startswith(b'@charset'))
+
+    def test_identity_served_without_gzip(self):
+        for accept in ('', 'br', 'gzip;q=0'):
+            with self.subTest(accept=accept):
+                response = self.get(self.css, HTTP_ACCEPT_ENCODING=accept)
+                response.close()
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_unhashed_names_revalidate(self):
+        response = self.get('img/logo.png', HTTP_ACCEPT_ENCODING='gzip')
+        response.close()
+
+        self.assertEqual(response['Cache-Control'], REVALIDATE)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertFalse(response.has_header('Vary'))
+
+    def test_not_modified(self):
+        path = os.path.join(self.static_root, self.logo)
+        response = self.get(
+            self.logo,
+            HTTP_IF_MODIFIED_SINCE=http_date(os.stat(path).st_mtime),
+        )
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['Cache-Control'], IMMUTABLE)
+
+    def test_missing_and_outside_files_fall_through(self):
+        for name in ('css/missing.css', '../yatube/settings.py'):
+            with self.subTest(name=name):
+                self.assertEqual(self.get(name).status_code, 404)
+
+
+class FaviconTests(TestCase):
+    def test_favicon_link_points_to_existing_file(self):
+        response = Client().get(reverse('posts:index'))
+
+        self.assertContains(
+            response,
+            '<link rel="icon" href="/static/img/fav/favicon.ico"',
+        )
+        self.assertIsNotNone(finders.find('img/fav/favicon.ico'))
@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..template_backends import TimedDjangoTemplates
+
+CACHED_LOADERS = [(
+    'django.template.loaders.cached.Loader',
+    ['django.template.loaders.filesystem.Loader'],
+)]
+
+
+class TemplatePrecompileTests(TestCase):
+    def make_backend(self, directory):
+        return TimedDjangoTemplates({
+            'NAME': 'precompile',
+            'DIRS': [directory],
+            'APP_DIRS': False,
+            'OPTIONS': {
+                'precompile': True,
+                'loaders': CACHED_LOADERS,
+            },
+        })
+
+    def test_project_templates_are_cached_at_start(self):
+        backend = self.make_backend(settings.TEMPLATES_DIR)
+        names = backend.precompile()
+        self.assertIn('posts/includes/paginator.html', names)
+        cache = backend.engine.template_loaders[0].get_template_cache
+        self.assertEqual(set(cache), set(names))
+        self.assertIs(
+            backend.get_template('base.html').template,
+            cache['base.html']
+        )
+
+    def test_broken_template_fails_fast(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with open(os.path.join(directory, 'broken.html'), 'w') as file:
+            file.write('{% if %}')
+        with self.assertRaisesMessage(ImproperlyConfigured, 'broken.html'):
+            self.make_backend(directory).precompile()
+
+    def test_render_time_is_reported_apart_from_view(self):
+        response = Client().get(reverse('about:author'))
+        timings = dict(
+            part.split(';dur=')
+            for part in response['Server-Timing'].split(', ')
+        )
+        self.assertEqual(set(timings), {'view', 'template', 'db'})
+        self.assertGreater(float(timings['template']), 0)
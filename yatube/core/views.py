@@ -0,0 +1,11 @@
+from django.http import Http404, HttpResponse
+
+from .metrics import exposition, metrics_allowed
+
+
+def metrics(request):
+    """Метрики в текстовом формате Prometheus для сборщика."""
+    if not metrics_allowed(request):
+        raise Http404
+    return HttpResponse(
+        exposition(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,5 +1,8 @@
 from django.contrib import admin
+
 from .models import Post, Group
+from .paginators import PostCounterPaginator
+from .search import FTS_TABLE, fts_available, match_expression
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -11,9 +14,44 @@ class PostAdmin(admin.ModelAdmin):
         'group',
     )
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
+    # DateFieldListFilter строит фиксированные диапазоны (сегодня,
+    # 7 дней, месяц) без DISTINCT по датам; диапазон идёт по
+    # индексу post_pub_date_idx.
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
+    paginator = PostCounterPaginator
+    show_full_result_count = False
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(
+            db_field, request, **kwargs)
+        if db_field.name == 'group' and formfield is not None:
+            # Один список групп на весь рендер списка, а не запрос
+            # на каждый <select> в list_editable.
+            choices = getattr(request, '_group_choices', None)
+            if choices is None:
+                choices = list(formfield.choices)
+                request._group_choices = choices
+            formfield.choices = choices
+        return formfield
+
+    def get_search_results(self, request, queryset, search_term):
+        # С FTS5 ищем по индексу, а не через LIKE '%...%' по всей таблице.
+        if not search_term.strip() or not fts_available():
+            return super().get_search_results(
+                request, queryset, search_term)
+        # pk__in=RawSQL(...) даёт "IN ((SELECT ...))", а SQLite читает
+        # двойные скобки как скалярный подзапрос и берёт одну строку.
+        matched = queryset.extra(
+            where=[
+                f'"posts_post"."id" IN (SELECT rowid FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s)'
+            ],
+            params=[match_expression(search_term)],
+        )
+        return matched, False
 
 
 admin.site.register(Post, PostAdmin)
@@ -3,3 +3,19 @@ from django.apps import AppConfig
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+        from django.test.signals import setting_changed
+
+        from core.metrics import register_collector
+
+        from . import lookups, receivers  # noqa: F401
+        from .querycache import exposition, install, reinstall
+        # install() сам ничего не ставит, пока POST_QUERY_CACHE выключен.
+        connection_created.connect(install)
+        setting_changed.connect(reinstall)
+        register_collector(exposition)
+        for connection in connections.all():
+            install(connection)
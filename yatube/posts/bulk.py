@@ -0,0 +1,18 @@
+from contextlib import contextmanager
+
+from .models import Post
+
+
+@contextmanager
+def keep_pub_date():
+    """bulk_create сохраняет pub_date из объектов, а не текущее время.
+
+    Меняет поле модели на время блока, поэтому только для команд
+    управления, не для кода веб-процесса.
+    """
+    field = Post._meta.get_field('pub_date')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
@@ -0,0 +1,186 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition
+
+VERSION_PREFIX = 'posts:version'
+CARD_PREFIX = 'posts:card'
+PAGE_PREFIX = 'posts:page'
+PAGE_PARAMS = ('page', 'cursor')
+
+
+def new_version():
+    """Новая версия — текущее время в микросекундах."""
+    return int(time.time() * 1000000)
+
+
+def version_key(kind, pk):
+    return f'{VERSION_PREFIX}:{kind}:{pk}'
+
+
+def get_versions(keys):
+    """Читает версии одним запросом к кэшу, недостающие заводит заново.
+
+    Заново заведённая версия никогда не совпадёт со старой, поэтому
+    вытесненный из кэша счётчик не воскресит устаревший фрагмент.
+    """
+    versions = cache.get_many(keys)
+    missing = {
+        key: new_version() for key in keys if key not in versions
+    }
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return versions
+
+
+def bump_versions(kind, pks):
+    version = new_version()
+    cache.set_many(
+        {version_key(kind, pk): version for pk in pks}, None)
+
+
+def bump_versions_on_commit(kind, pks):
+    """bump_versions сейчас и ещё раз после коммита транзакции.
+
+    Сейчас — чтобы сама транзакция не видела старых фрагментов; после
+    коммита — чтобы чужой запрос, прочитавший старые строки до коммита,
+    не оставил их в кэше под новой версией.
+    """
+    pks = list(pks)
+    bump_versions(kind, pks)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: bump_versions(kind, pks))
+
+
+def version_time(version):
+    """Момент, когда была выдана версия, — для Last-Modified."""
+    return datetime.fromtimestamp(version / 1000000, tz=timezone.utc)
+
+
+def card_version_keys(post):
+    return (
+        version_key('post', post.pk),
+        version_key('author', post.author_id),
+        version_key('group', post.group_id),
+    )
+
+
+def card_keys(posts):
+    """Ключи карточек: id поста плюс версии поста, автора и группы."""
+    version_keys = {post.pk: card_version_keys(post) for post in posts}
+    versions = get_versions(
+        [key for keys in version_keys.values() for key in keys])
+    return {
+        pk: ':'.join(
+            [CARD_PREFIX, str(pk)]
+            + [str(versions[key]) for key in keys]
+        )
+        for pk, keys in version_keys.items()
+    }
+
+
+def card_timeout():
+    return getattr(settings, 'POST_CARD_CACHE_TIMEOUT', 60 * 60)
+
+
+def feed_name(view_name, *args):
+    """Имя ленты: имя view и его аргументы, например posts:profile:leo."""
+    return ':'.join([view_name, *map(str, args)])
+
+
+def bump_feeds(names):
+    bump_versions_on_commit('feed', names)
+
+
+def feed_page_timeout():
+    return getattr(settings, 'FEED_PAGE_CACHE_TIMEOUT', 0)
+
+
+def page_params(request):
+    return ':'.join(request.GET.get(param, '') for param in PAGE_PARAMS)
+
+
+def cache_feed_page(view):
+    """Кэширует страницы ленты целиком для анонимных читателей.
+
+    Ключ — имя ленты, версия ленты и параметры ?page=/?cursor=.
+    Сигналы поднимают версию только у затронутых лент, остальные
+    страницы в кэше не трогаются.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        timeout = feed_page_timeout()
+        if (
+            timeout <= 0
+            or request.method != 'GET'
+            or request.user.is_authenticated
+        ):
+            return view(request, *args, **kwargs)
+        name = feed_name(
+            request.resolver_match.view_name, *args, *kwargs.values())
+        version_name = version_key('feed', name)
+        version = get_versions([version_name])[version_name]
+        key = f'{PAGE_PREFIX}:{name}:{version}:{page_params(request)}'
+        response = cache.get(key)
+        if response is None:
+            response = view(request, *args, **kwargs)
+            patch_vary_headers(response, ('Cookie',))
+            if response.status_code == 200:
+                cache.set(key, response, timeout)
+        return response
+    return wrapper
+
+
+def make_etag(*parts):
+    return hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+
+def viewer_state(request):
+    """Часть валидатора от зрителя: шапка страницы зависит от входа."""
+    if request.user.is_authenticated:
+        return f'user-{request.user.pk}'
+    return 'anon'
+
+
+def conditional_view(state):
+    """condition(), где ETag и Last-Modified считаются одним вызовом.
+
+    state(request, *args, **kwargs) возвращает пару (etag,
+    last_modified); (None, None) — валидаторов нет, view отвечает как
+    обычно. 304 уходит раньше, чем view что-либо загрузит.
+    """
+    def validators(request, *args, **kwargs):
+        if not hasattr(request, '_validators'):
+            request._validators = state(request, *args, **kwargs)
+        return request._validators
+
+    return condition(
+        etag_func=lambda *args, **kwargs: validators(*args, **kwargs)[0],
+        last_modified_func=(
+            lambda *args, **kwargs: validators(*args, **kwargs)[1]),
+    )
+
+
+def conditional_pages():
+    """Включены ли ETag и Last-Modified, собранные из версий в кэше."""
+    return settings.CONDITIONAL_PAGES
+
+
+def feed_page_state(request, *args, **kwargs):
+    """Валидаторы страницы ленты из её версии в кэше, без запросов к БД."""
+    if not conditional_pages():
+        return None, None
+    name = feed_name(
+        request.resolver_match.view_name, *args, *kwargs.values())
+    key = version_key('feed', name)
+    version = get_versions([key])[key]
+    etag = make_etag(
+        name, version, page_params(request), viewer_state(request))
+    return etag, version_time(version)
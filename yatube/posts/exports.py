@@ -0,0 +1,58 @@
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+
+EXPORT_FIELDS = ('id', 'text', 'pub_date', 'author', 'group')
+EXPORT_COLUMNS = (
+    'pk', 'text', 'pub_date', 'author__username', 'group__slug')
+EXPORT_FORMATS = ('jsonl', 'csv')
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def export_rows(queryset, chunk_size=2000):
+    """Строки постов потоком: только нужные колонки, без моделей."""
+    return queryset.order_by('pk').values_list(
+        *EXPORT_COLUMNS).iterator(chunk_size=chunk_size)
+
+
+def jsonl_lines(rows):
+    for row in rows:
+        record = dict(zip(EXPORT_FIELDS, row))
+        record['pub_date'] = record['pub_date'].isoformat()
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+class Echo:
+    """Псевдофайл для csv.writer: write() просто возвращает строку."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for pk, text, pub_date, author, group in rows:
+        yield writer.writerow(
+            (pk, text, pub_date.isoformat(), author, group or ''))
+
+
+def export_lines(fmt, rows):
+    if fmt == 'csv':
+        return csv_lines(rows)
+    return jsonl_lines(rows)
+
+
+def export_response(queryset, fmt, filename):
+    """Ответ, который отдаёт ленту кусками прямо из курсора базы."""
+    response = StreamingHttpResponse(
+        export_lines(fmt, export_rows(queryset)),
+        content_type=CONTENT_TYPES[fmt],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{filename}.{fmt}"')
+    return response
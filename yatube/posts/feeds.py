@@ -0,0 +1,147 @@
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.db.models import Max
+from django.template.defaultfilters import linebreaks
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+
+from .caching import conditional_view
+from .lookups import authors, groups
+from .models import Post, PostCounter
+
+
+def feed_state(scope, object_id):
+    """Валидаторы ленты: (ETag, Last-Modified) или None, если её нет.
+
+    MAX(updated) сдвигается и от новых постов, и от правок старых, и
+    берётся одним поиском по индексу (updated) или (author|group,
+    updated) — сами посты ленты не читаются.
+    Число постов в ETag ловит удаления, которые MAX(updated) не сдвигают.
+    """
+    if scope == PostCounter.ALL:
+        posts = Post.objects.all()
+    elif object_id is None:
+        return None
+    else:
+        posts = Post.objects.filter(**{f'{scope}_id': object_id})
+    latest = posts.aggregate(latest=Max('updated'))['latest']
+    count = PostCounter.objects.get_count(scope, object_id or 0)
+    # Микросекунды: правка в ту же секунду тоже меняет ETag.
+    stamp = int(latest.timestamp() * 1000000) if latest else 0
+    return f'{scope}-{object_id or 0}-{stamp}-{count}', latest
+
+
+def conditional_feed(scope, lookup=None):
+    """Условный GET для ленты: 304 до загрузки постов."""
+    def state(request, **kwargs):
+        object_id = 0
+        if lookup is not None:
+            found = lookup.get(kwargs[lookup.field])
+            object_id = found.pk if found is not None else None
+        return feed_state(scope, object_id) or (None, None)
+
+    return conditional_view(state)
+
+
+class PostsFeed(Feed):
+    """Общая часть RSS-лент: последние посты с автором и группой."""
+
+    def posts(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        return self.posts(obj).select_related(
+            'author', 'group')[:settings.POST_LIMIT]
+
+    def item_title(self, post):
+        return Truncator(post.text).chars(50)
+
+    def item_description(self, post):
+        return linebreaks(post.text, autoescape=True)
+
+    def item_link(self, post):
+        return reverse('posts:post_detail', kwargs={'post_id': post.pk})
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_updateddate(self, post):
+        return post.updated
+
+    def item_author_name(self, post):
+        return post.author.get_full_name() or post.author.username
+
+
+class IndexFeed(PostsFeed):
+    title = 'Yatube: последние записи'
+    description = 'Свежие посты всех авторов'
+
+    def link(self):
+        return reverse('posts:index')
+
+
+class GroupFeed(PostsFeed):
+    def get_object(self, request, slug):
+        return groups.get_or_404(slug)
+
+    def posts(self, group):
+        return group.posts.all()
+
+    def title(self, group):
+        return f'Yatube: {group.title}'
+
+    def description(self, group):
+        return group.description
+
+    def link(self, group):
+        return reverse('posts:group_posts', kwargs={'slug': group.slug})
+
+
+class AuthorFeed(PostsFeed):
+    def get_object(self, request, username):
+        return authors.get_or_404(username)
+
+    def posts(self, author):
+        return author.posts.all()
+
+    def title(self, author):
+        return f'Yatube: {author.get_full_name() or author.username}'
+
+    def description(self, author):
+        return f'Записи пользователя {author.username}'
+
+    def link(self, author):
+        return reverse(
+            'posts:profile', kwargs={'username': author.username})
+
+
+class AtomIndexFeed(IndexFeed):
+    feed_type = Atom1Feed
+    subtitle = IndexFeed.description
+
+
+class AtomGroupFeed(GroupFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, group):
+        return group.description
+
+
+class AtomAuthorFeed(AuthorFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, author):
+        return self.description(author)
+
+
+index_conditional = conditional_feed(PostCounter.ALL)
+group_conditional = conditional_feed(PostCounter.GROUP, groups)
+author_conditional = conditional_feed(PostCounter.AUTHOR, authors)
+
+index_rss = index_conditional(IndexFeed())
+index_atom = index_conditional(AtomIndexFeed())
+group_rss = group_conditional(GroupFeed())
+group_atom = group_conditional(AtomGroupFeed())
+author_rss = author_conditional(AuthorFeed())
+author_atom = author_conditional(AtomAuthorFeed())
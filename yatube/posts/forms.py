@@ -6,3 +6,11 @@ class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         fields = ('text', 'group')
+
+
+class PostImageForm(forms.ModelForm):
+    """Картинка поста отдельной формой: у PostForm ровно два поля."""
+
+    class Meta:
+        model = Post
+        fields = ('image',)
@@ -0,0 +1,147 @@
+"""Кэш поиска групп по slug и авторов по username.
+
+Сначала LRU процесса, затем кэш OBJECT_CACHE_ALIAS, затем БД.
+Несуществующий slug или username тоже кэшируется, но ненадолго:
+сканеры перебирают именно их. Сохранение и удаление сбрасывают
+запись и по старому значению поля (оно запоминается в post_init), и
+по новому — переименование не оставит в кэше ни старого объекта,
+ни отрицательной записи.
+
+Сигнал сбрасывает LRU только своего процесса, поэтому записи в нём
+живут OBJECT_CACHE_LOCAL_TIMEOUT секунд. Кэш второго уровня сигнал
+сбрасывает для всех процессов, только если он общий (memcached); с
+LocMemCache он у каждого процесса свой, и настройки ограничивают его
+записи тем же сроком, что и у LRU.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_init, post_save
+from django.http import Http404
+
+from .models import Group, User
+
+LOOKUP_PREFIX = 'posts:lookup'
+# Отрицательная запись: объекта с таким значением поля нет.
+MISSING = 'missing'
+
+
+class LRUCache:
+    """Ограниченный словарь процесса с TTL у каждой записи."""
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout, size):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + timeout)
+            self.entries.move_to_end(key)
+            while len(self.entries) > size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class ObjectLookup:
+    """Поиск объекта модели по уникальному полю через кэши."""
+
+    def __init__(self, model, field):
+        self.model = model
+        self.field = field
+        self.local = LRUCache()
+        self.loaded_attr = f'_loaded_{field}'
+        post_init.connect(self.remember, sender=model, weak=False)
+        post_save.connect(self.expire_saved, sender=model, weak=False)
+        post_delete.connect(self.expire, sender=model, weak=False)
+
+    @property
+    def cache(self):
+        return caches[settings.OBJECT_CACHE_ALIAS]
+
+    def key(self, value):
+        return f'{LOOKUP_PREFIX}:{self.model._meta.label_lower}:{value}'
+
+    def get(self, value):
+        """Объект или None, если его нет."""
+        key = self.key(value)
+        found = self.local.get(key)
+        if found is None:
+            found = self.cache.get(key)
+            if found is None:
+                found = self.model.objects.filter(
+                    **{self.field: value}).first() or MISSING
+                self.cache.set(key, found, self.timeout(found))
+            self.local.set(
+                key,
+                found,
+                min(settings.OBJECT_CACHE_LOCAL_TIMEOUT, self.timeout(found)),
+                settings.OBJECT_CACHE_SIZE,
+            )
+        return None if found == MISSING else found
+
+    def get_or_404(self, value):
+        found = self.get(value)
+        if found is None:
+            raise Http404(f'{self.model._meta.object_name} не найден')
+        return found
+
+    def timeout(self, found):
+        if found == MISSING:
+            return settings.OBJECT_CACHE_MISSING_TIMEOUT
+        return settings.OBJECT_CACHE_TIMEOUT
+
+    def invalidate(self, *values):
+        keys = [self.key(value) for value in set(values) if value]
+        self.cache.delete_many(keys)
+        for key in keys:
+            self.local.delete(key)
+
+    def clear(self):
+        self.local.clear()
+
+    def remember(self, sender, instance, **kwargs):
+        # Отложенное поле не загружаем: запомнится None, и сброс
+        # пойдёт только по новому значению.
+        setattr(
+            instance, self.loaded_attr, instance.__dict__.get(self.field))
+
+    def expire_saved(self, sender, instance, update_fields=None, **kwargs):
+        # Вход меняет только last_login — объект в кэше этим не устарел.
+        if update_fields is not None and set(update_fields) <= {
+            'last_login'
+        }:
+            return
+        self.expire(sender, instance)
+        self.remember(sender, instance)
+
+    def expire(self, sender, instance, **kwargs):
+        self.invalidate(
+            getattr(instance, self.loaded_attr, None),
+            getattr(instance, self.field),
+        )
+
+
+groups = ObjectLookup(Group, 'slug')
+authors = ObjectLookup(User, 'username')
@@ -0,0 +1,48 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.models import Post
+from posts.search import fts_available, ranked_ids
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает поиск через LIKE и через FTS5 на текущей базе.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('queries', nargs='+')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def measure(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), max(timings)
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            raise CommandError('FTS5-индекс не найден.')
+        limit = settings.POST_LIMIT
+        self.stdout.write(
+            f'Постов в базе: {Post.objects.count()}, '
+            f'повторов: {options["repeat"]}'
+        )
+        for query in options['queries']:
+            like = self.measure(
+                lambda: list(Post.objects.filter(
+                    text__icontains=query).values_list('id')[:limit]),
+                options['repeat'],
+            )
+            fts = self.measure(
+                lambda: ranked_ids(query, limit=limit),
+                options['repeat'],
+            )
+            self.stdout.write(
+                f'{query!r}: LIKE медиана {like[0]:.2f} мс '
+                f'(макс {like[1]:.2f}), FTS5 медиана {fts[0]:.2f} мс '
+                f'(макс {fts[1]:.2f})'
+            )
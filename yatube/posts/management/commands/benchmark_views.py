@@ -0,0 +1,152 @@
+import json
+import math
+import platform
+import random
+import time
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max, Min
+from django.test import Client
+from django.urls import reverse
+
+from core.queries import QueryTimer
+from posts.models import Group, Post, PostCounter
+
+User = get_user_model()
+
+VIEWS = (
+    'posts:index',
+    'posts:group_posts',
+    'posts:profile',
+    'posts:post_detail',
+    'posts:post_create',
+)
+
+
+def percentile(values, share):
+    """Перцентиль методом ближайшего ранга (statistics.quantiles — 3.8+)."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(share * len(ordered)) - 1, 0)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет p50/p95/p99 и число SQL-запросов для view постов на '
+        'текущей базе и пишет JSON-отчёт для сравнения релизов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--views', nargs='+', choices=VIEWS,
+                            default=list(VIEWS))
+        parser.add_argument(
+            '--anonymous', action='store_true',
+            help='Ходить без входа (через кэш страниц лент).'
+        )
+        parser.add_argument(
+            '--username',
+            help='Автор для post_create; по умолчанию самый активный.'
+        )
+        parser.add_argument('--output', help='Файл отчёта, иначе stdout.')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        bounds = Post.objects.aggregate(low=Min('pk'), high=Max('pk'))
+        if bounds['high'] is None:
+            raise CommandError('Постов нет: сначала запустите seed_posts.')
+        self.bounds = bounds
+        self.group_slugs = list(
+            Group.objects.values_list('slug', flat=True)[:10_000])
+        self.usernames = list(User.objects.filter(
+            pk__in=PostCounter.objects.filter(
+                scope=PostCounter.AUTHOR
+            ).order_by('-count').values('object_id')[:10_000]
+        ).values_list('username', flat=True))
+        writer = (
+            User.objects.get(username=options['username'])
+            if options['username'] else
+            User.objects.get(username=self.usernames[0])
+        )
+        reader = Client()
+        if not options['anonymous']:
+            reader.force_login(writer)
+        author = Client()
+        author.force_login(writer)
+
+        report = {
+            'meta': {
+                'created': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': settings.DATABASES['default']['ENGINE'],
+                'posts': PostCounter.objects.total(),
+                'groups': len(self.group_slugs),
+                'requests_per_view': options['requests'],
+                'anonymous': options['anonymous'],
+            },
+            'views': {},
+        }
+        for view in options['views']:
+            client = author if view == 'posts:post_create' else reader
+            report['views'][view] = self.measure(
+                view, client, options['requests'])
+            self.stderr.write(f'{view}: {report["views"][view]}')
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as report_file:
+                report_file.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def request_args(self, view):
+        """Случайный URL view, включая глубокие страницы лент."""
+        page = {'page': random.randint(1, 50)}
+        if view == 'posts:index':
+            return 'get', reverse(view), page
+        if view == 'posts:group_posts':
+            slug = random.choice(self.group_slugs)
+            return 'get', reverse(view, kwargs={'slug': slug}), page
+        if view == 'posts:profile':
+            username = random.choice(self.usernames)
+            return 'get', reverse(view, kwargs={'username': username}), page
+        if view == 'posts:post_detail':
+            post_id = random.randint(self.bounds['low'], self.bounds['high'])
+            return 'get', reverse(view, kwargs={'post_id': post_id}), {}
+        return 'post', reverse(view), {'text': 'Пост из бенчмарка'}
+
+    def send(self, client, method, url, data):
+        if method == 'get':
+            return client.get(url, data)
+        # Запись откатывается, чтобы бенчмарк не оставлял постов в базе;
+        # цена самого COMMIT в замер поэтому не входит.
+        with transaction.atomic():
+            response = client.post(url, data)
+            transaction.set_rollback(True)
+        return response
+
+    def measure(self, view, client, count):
+        latencies, queries, statuses = [], [], {}
+        for _ in range(count):
+            method, url, data = self.request_args(view)
+            timer = QueryTimer()
+            started = time.perf_counter()
+            with timer.record():
+                response = self.send(client, method, url, data)
+            latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(timer.count)
+            status = str(response.status_code)
+            statuses[status] = statuses.get(status, 0) + 1
+        return {
+            'p50_ms': round(percentile(latencies, 0.50), 3),
+            'p95_ms': round(percentile(latencies, 0.95), 3),
+            'p99_ms': round(percentile(latencies, 0.99), 3),
+            'mean_queries': round(sum(queries) / len(queries), 2),
+            'max_queries': max(queries),
+            'statuses': statuses,
+        }
@@ -0,0 +1,59 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.exports import EXPORT_FORMATS, export_lines, export_rows
+from posts.models import Post
+
+REPORT_EVERY = 100_000
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает посты в JSONL/CSV потоком через iterator(): '
+        'память не растёт с числом постов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл или "-" для stdout.')
+        parser.add_argument('--format', choices=EXPORT_FORMATS)
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--author', help='Только посты автора.')
+        parser.add_argument('--group', help='Только посты группы (slug).')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl')
+        queryset = Post.objects.all()
+        if options['author']:
+            queryset = queryset.filter(author__username=options['author'])
+        if options['group']:
+            queryset = queryset.filter(group__slug=options['group'])
+        rows = export_rows(queryset, options['chunk_size'])
+        target = (
+            sys.stdout if path == '-'
+            else open(path, 'w', newline='', encoding='utf-8')
+        )
+        started = time.monotonic()
+        exported = 0
+        try:
+            lines = enumerate(export_lines(fmt, rows), start=1)
+            for exported, line in lines:
+                target.write(line)
+                if exported and exported % REPORT_EVERY == 0:
+                    self.report(exported, started)
+        finally:
+            if target is not sys.stdout:
+                target.close()
+        if fmt == 'csv':
+            exported = max(exported - 1, 0)
+        self.report(exported, started)
+
+    def report(self, exported, started):
+        elapsed = time.monotonic() - started
+        self.stderr.write(
+            f'Выгружено {exported}, '
+            f'{exported / max(elapsed, 1e-9):.0f} постов в секунду'
+        )
@@ -0,0 +1,142 @@
+import csv
+import json
+import os
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.bulk import keep_pub_date
+from posts.exports import EXPORT_FORMATS
+from posts.models import Group, ImportCheckpoint, Post
+
+User = get_user_model()
+
+
+def read_lines(path, offset):
+    """Строки файла с байтовым смещением конца каждой строки."""
+    with open(path, 'rb') as source:
+        source.seek(offset)
+        for line in source:
+            offset += len(line)
+            yield line.decode('utf-8'), offset
+
+
+def read_records(path, fmt, offset):
+    """Записи файла потоком; после каждой — смещение, где она кончилась.
+
+    csv.reader сам склеивает строки, если в тексте поста есть перевод
+    строки, поэтому смещение берётся после последней прочитанной строки.
+    """
+    position = offset
+
+    def lines():
+        nonlocal position
+        for line, end in read_lines(path, offset):
+            position = end
+            yield line
+
+    if fmt == 'jsonl':
+        for line in lines():
+            if line.strip():
+                yield json.loads(line), position
+        return
+    with open(path, newline='', encoding='utf-8') as source:
+        header = next(csv.reader(source))
+    reader = csv.reader(lines())
+    if offset == 0:
+        next(reader, None)
+    for row in reader:
+        yield dict(zip(header, row)), position
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует посты из JSONL/CSV потоком: bulk_create пачками, '
+        'авторы и группы по username и slug. После сбоя повторный '
+        'запуск продолжает с последней сохранённой пачки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=EXPORT_FORMATS)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Забыть сохранённую позицию и начать файл сначала.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'Файл {path} не найден')
+        fmt = options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl')
+        self.checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+            source=os.path.abspath(path))
+        if options['restart']:
+            self.checkpoint.offset = self.checkpoint.rows = 0
+            self.checkpoint.save()
+        elif self.checkpoint.offset:
+            self.stdout.write(
+                f'Продолжаем с {self.checkpoint.rows} строк '
+                f'(байт {self.checkpoint.offset})'
+            )
+        # Справочники целиком в памяти: авторов и групп на порядки
+        # меньше, чем постов, а поиск в словаре не ходит в базу.
+        self.authors = dict(User.objects.values_list('username', 'pk'))
+        self.groups = dict(Group.objects.values_list('slug', 'pk'))
+        self.skipped = 0
+        self.imported = 0
+        self.started = time.monotonic()
+
+        batch, pending, offset = [], 0, self.checkpoint.offset
+        with keep_pub_date():
+            for record, offset in read_records(path, fmt, offset):
+                post = self.build_post(record)
+                if post is None:
+                    self.skipped += 1
+                else:
+                    batch.append(post)
+                pending += 1
+                if pending >= options['batch_size']:
+                    self.flush(batch, pending, offset)
+                    batch, pending = [], 0
+            if pending:
+                self.flush(batch, pending, offset)
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано {self.imported}, пропущено {self.skipped}'))
+
+    def build_post(self, record):
+        author_id = self.authors.get(record.get('author'))
+        if author_id is None:
+            return None
+        pub_date = parse_datetime(record.get('pub_date') or '')
+        if pub_date is None:
+            pub_date = timezone.now()
+        elif timezone.is_naive(pub_date):
+            pub_date = timezone.make_aware(pub_date)
+        return Post(
+            text=record.get('text') or '',
+            author_id=author_id,
+            group_id=self.groups.get(record.get('group') or None),
+            pub_date=pub_date,
+        )
+
+    def flush(self, batch, pending, offset):
+        # Пачка и позиция в файле фиксируются одной транзакцией:
+        # после падения ни одна строка не потеряется и не задвоится.
+        with transaction.atomic():
+            Post.objects.bulk_create(batch)
+            self.checkpoint.offset = offset
+            self.checkpoint.rows += pending
+            self.checkpoint.save()
+        self.imported += len(batch)
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(
+            f'Строк {self.checkpoint.rows}, '
+            f'{self.imported / max(elapsed, 1e-9):.0f} постов в секунду'
+        )
@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from posts.search import FTS_TABLE, fts_available
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет FTS5-индекс постов пачками. Можно прервать и '
+        'запустить снова с --start-after: повторная запись строки '
+        'безопасна.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--start-after', type=int, default=0,
+            help='Продолжить с постов, чей id больше указанного.'
+        )
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            raise CommandError(
+                'FTS5-индекс не найден: нужна SQLite с FTS5 и миграции.')
+        batch_size = options['batch_size']
+        last_id = options['start_after']
+        indexed = 0
+        started = time.monotonic()
+        while True:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT MAX(id), COUNT(*) FROM ('
+                    ' SELECT id FROM posts_post WHERE id > %s'
+                    ' ORDER BY id LIMIT %s)',
+                    [last_id, batch_size]
+                )
+                batch_last_id, count = cursor.fetchone()
+                if not count:
+                    break
+                cursor.execute(
+                    f'INSERT OR REPLACE INTO {FTS_TABLE}(rowid, text)'
+                    ' SELECT id, text FROM posts_post'
+                    ' WHERE id > %s AND id <= %s',
+                    [last_id, batch_last_id]
+                )
+            last_id = batch_last_id
+            indexed += count
+            self.stdout.write(f'Проиндексировано {indexed}, id <= {last_id}')
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: {indexed} постов за {elapsed:.1f} с'))
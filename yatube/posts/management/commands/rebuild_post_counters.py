@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from posts.models import Follow, Post, PostCounter
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает денормализованные счётчики постов и подписчиков '
+        'с нуля.'
+    )
+
+    def handle(self, *args, **options):
+        counters = [PostCounter(
+            scope=PostCounter.ALL, count=Post.objects.count())]
+        by_author = Post.objects.order_by().values('author').annotate(
+            total=Count('id'))
+        counters.extend(
+            PostCounter(
+                scope=PostCounter.AUTHOR,
+                object_id=row['author'],
+                count=row['total'],
+            ) for row in by_author
+        )
+        by_group = Post.objects.order_by().filter(
+            group__isnull=False).values('group').annotate(total=Count('id'))
+        counters.extend(
+            PostCounter(
+                scope=PostCounter.GROUP,
+                object_id=row['group'],
+                count=row['total'],
+            ) for row in by_group
+        )
+        # Подписчиков тоже: по ним merged_authors() находит авторов,
+        # чьи посты подмешиваются в ленты при чтении.
+        by_followed = Follow.objects.order_by().values('author').annotate(
+            total=Count('id'))
+        counters.extend(
+            PostCounter(
+                scope=PostCounter.FOLLOWERS,
+                object_id=row['author'],
+                count=row['total'],
+            ) for row in by_followed
+        )
+        with transaction.atomic():
+            PostCounter.objects.all().delete()
+            PostCounter.objects.bulk_create(counters, batch_size=1000)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано счётчиков: {len(counters)}'))
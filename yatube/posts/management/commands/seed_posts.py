@@ -0,0 +1,122 @@
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from posts.bulk import keep_pub_date
+from posts.models import Group, Post
+
+User = get_user_model()
+
+# Готовые наборы: посты, группы, авторы.
+SIZES = {
+    'small': (10_000, 100, 1_000),
+    'medium': (1_000_000, 1_000, 20_000),
+    'large': (10_000_000, 5_000, 100_000),
+}
+TEXT_POOL = 2_000
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро наполняет базу тестовыми данными для бенчмарков: '
+        'bulk_create пачками, авторы с распределением Ципфа.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', choices=SIZES, default='small')
+        parser.add_argument('--posts', type=int)
+        parser.add_argument('--groups', type=int)
+        parser.add_argument('--authors', type=int)
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Показатель Ципфа: чем больше, тем сильнее перекос.'
+        )
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        posts, groups, authors = SIZES[options['size']]
+        posts = options['posts'] or posts
+        groups = options['groups'] or groups
+        authors = options['authors'] or authors
+        random.seed(options['seed'])
+        fake = Faker('ru_RU')
+        fake.seed_instance(options['seed'])
+        prefix = f'seed{int(time.time())}'
+
+        author_ids = self.create_authors(prefix, authors, options)
+        group_ids = self.create_groups(prefix, groups, fake, options)
+        # Faker на каждый пост слишком медленный: берём тексты из пула.
+        texts = [fake.paragraph(nb_sentences=3) for _ in range(TEXT_POOL)]
+        weights = list(accumulate(
+            1 / rank ** options['skew'] for rank in range(1, authors + 1)))
+
+        started = time.monotonic()
+        now = timezone.now()
+        step = timedelta(days=options['days']) / posts
+        created = 0
+        with keep_pub_date():
+            while created < posts:
+                size = min(options['batch_size'], posts - created)
+                batch_authors = random.choices(
+                    author_ids, cum_weights=weights, k=size)
+                batch = [
+                    Post(
+                        text=random.choice(texts),
+                        author_id=author_id,
+                        # Каждый пятый пост без группы.
+                        group_id=(
+                            random.choice(group_ids)
+                            if random.random() > 0.2 else None
+                        ),
+                        pub_date=now - step * (posts - created - offset),
+                    )
+                    for offset, author_id in enumerate(batch_authors)
+                ]
+                with transaction.atomic():
+                    Post.objects.bulk_create(batch)
+                created += size
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'Постов: {created}/{posts}, '
+                    f'{created / max(elapsed, 1e-9):.0f} в секунду'
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: {authors} авторов, {groups} групп, {posts} постов'))
+
+    def create_authors(self, prefix, count, options):
+        # Хэш пароля не считаем: тысячи вызовов PBKDF2 — минуты.
+        User.objects.bulk_create(
+            (
+                User(username=f'{prefix}_user{num}', password='!')
+                for num in range(count)
+            ),
+            batch_size=options['batch_size'],
+        )
+        return list(User.objects.filter(
+            username__startswith=f'{prefix}_user'
+        ).order_by('pk').values_list('pk', flat=True))
+
+    def create_groups(self, prefix, count, fake, options):
+        Group.objects.bulk_create(
+            (
+                Group(
+                    title=fake.catch_phrase()[:200],
+                    slug=f'{prefix}-group{num}',
+                    description=fake.sentence(),
+                )
+                for num in range(count)
+            ),
+            batch_size=options['batch_size'],
+        )
+        return list(Group.objects.filter(
+            slug__startswith=f'{prefix}-group'
+        ).values_list('pk', flat=True))
@@ -0,0 +1,62 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:10
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    PostCounter = apps.get_model('posts', 'PostCounter')
+    posts = Post.objects.order_by()
+    counters = [PostCounter(scope='all', count=posts.count())]
+    for row in posts.values('author').annotate(total=Count('id')):
+        counters.append(PostCounter(
+            scope='author', object_id=row['author'], count=row['total']))
+    by_group = posts.filter(group__isnull=False).values('group')
+    for row in by_group.annotate(total=Count('id')):
+        counters.append(PostCounter(
+            scope='group', object_id=row['group'], count=row['total']))
+    PostCounter.objects.bulk_create(counters, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0002_auto_20221114_2150'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='post',
+            options={'ordering': ['-pub_date']},
+        ),
+        migrations.AlterField(
+            model_name='group',
+            name='slug',
+            field=models.SlugField(unique=True),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='group',
+            field=models.ForeignKey(blank=True, help_text='Укажите название группы', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='posts', to='posts.Group', verbose_name='Группа'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='text',
+            field=models.TextField(help_text='Текст вашего поста', verbose_name='Текст'),
+        ),
+        migrations.CreateModel(
+            name='PostCounter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('all', 'Все посты'), ('author', 'Посты автора'), ('group', 'Посты группы')], max_length=6)),
+                ('object_id', models.PositiveIntegerField(default=0)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('scope', 'object_id')},
+            },
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,83 @@
+from django.db import OperationalError, migrations
+
+FTS_TABLE = 'posts_post_fts'
+
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(text)",
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON posts_post BEGIN
+        INSERT OR REPLACE INTO {FTS_TABLE}(rowid, text)
+        VALUES (new.id, new.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE OF text ON posts_post
+    BEGIN
+        INSERT OR REPLACE INTO {FTS_TABLE}(rowid, text)
+        VALUES (new.id, new.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON posts_post BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+)
+
+DROP_SQL = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_delete',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+
+def create_fts(apps, schema_editor):
+    # Только SQLite со сборкой FTS5; иначе поиск работает через LIKE.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute(CREATE_SQL[0])
+        except OperationalError:
+            return
+        for sql in CREATE_SQL[1:]:
+            cursor.execute(sql)
+
+
+def restore_fts_triggers(apps, schema_editor):
+    """Возвращает триггеры после перестройки posts_post.
+
+    AddField/AlterField на SQLite копируют таблицу в новую и удаляют
+    старую, а с ней и триггеры. Миграции, меняющие Post, вызывают это
+    следом.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = %s", [FTS_TABLE])
+        if cursor.fetchone() is None:
+            return
+        for sql in CREATE_SQL[1:]:
+            cursor.execute(sql.replace(
+                'CREATE TRIGGER', 'CREATE TRIGGER IF NOT EXISTS'))
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for sql in DROP_SQL:
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
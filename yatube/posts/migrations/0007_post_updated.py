@@ -0,0 +1,36 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:24
+
+from importlib import import_module
+
+from django.db import migrations, models
+from django.db.models import F
+
+post_fts = import_module('posts.migrations.0005_post_fts')
+
+
+def copy_pub_date(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.update(updated=F('pub_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_import_checkpoint'),
+    ]
+
+    operations = [
+        # При откате RemoveField тоже перестраивает таблицу: триггеры
+        # возвращаются следом, ведь обратные операции идут с конца.
+        migrations.RunPython(
+            migrations.RunPython.noop, post_fts.restore_fts_triggers),
+        migrations.AddField(
+            model_name='post',
+            name='updated',
+            field=models.DateTimeField(
+                auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.RunPython(
+            post_fts.restore_fts_triggers, migrations.RunPython.noop),
+        migrations.RunPython(copy_pub_date, migrations.RunPython.noop),
+    ]
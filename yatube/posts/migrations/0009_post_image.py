@@ -0,0 +1,29 @@
+# Generated by Django 2.2.16 on 2026-10-18 21:10
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+post_fts = import_module('posts.migrations.0005_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_follow_timeline'),
+    ]
+
+    operations = [
+        # При откате RemoveField тоже перестраивает таблицу: триггеры
+        # возвращаются следом, ведь обратные операции идут с конца.
+        migrations.RunPython(
+            migrations.RunPython.noop, post_fts.restore_fts_triggers),
+        migrations.AddField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(
+                blank=True, upload_to='posts/', verbose_name='Картинка'),
+        ),
+        migrations.RunPython(
+            post_fts.restore_fts_triggers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_post_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-updated'], name='post_updated_idx'),
+        ),
+    ]
@@ -1,4 +1,9 @@
-from django.db import models
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Q
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -13,12 +18,48 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    _cache_ttl = None
+
+    def cached(self, ttl=None):
+        """Результат берётся из кэша запросов, см. posts.querycache."""
+        from .querycache import default_timeout, enabled
+        clone = self._chain()
+        if enabled():
+            clone._cache_ttl = default_timeout() if ttl is None else ttl
+        return clone
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._cache_ttl = self._cache_ttl
+        return clone
+
+    def _fetch_all(self):
+        if self._cache_ttl is not None and self._result_cache is None:
+            from .querycache import fetch
+            self._result_cache = fetch(self, self._cache_ttl)
+        super()._fetch_all()
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # Импортируется здесь: signals ничего не знает о моделях.
+        from .signals import posts_bulk_created
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            posts_bulk_created.send(sender=self.model, posts=objs)
+        for obj in objs:
+            obj._loaded_group_id = obj.group_id
+        return objs
+
+
 class Post(models.Model):
     text = models.TextField(
         verbose_name='Текст',
         help_text='Текст вашего поста'
     )
     pub_date = models.DateTimeField(auto_now_add=True)
+    # pub_date не меняется при правке, а валидаторам HTTP нужна именно
+    # дата последнего изменения.
+    updated = models.DateTimeField('Дата изменения', auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -33,9 +74,225 @@ class Post(models.Model):
         related_name='posts',
         help_text='Укажите название группы'
     )
+    image = models.ImageField(
+        'Картинка',
+        upload_to='posts/',
+        blank=True
+    )
+
+    objects = PostQuerySet.as_manager()
 
     def __str__(self):
         return self.text[:15]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем группу из БД, чтобы заметить перенос поста,
+        # и картинку — чтобы удалить файл, когда её заменят.
+        instance._loaded_group_id = instance.__dict__.get('group_id')
+        instance._loaded_image = instance.__dict__.get('image')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Счётчики обновляются в post_save в той же транзакции.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+        # Обработчики post_save уже видели прежние группу и картинку.
+        self._loaded_group_id = self.group_id
+        # Отложенную картинку не загружаем ради этого отдельным запросом.
+        image = self.__dict__.get('image')
+        self._loaded_image = getattr(image, 'name', image)
+
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        # По индексу на каждую форму ленты: index, profile, group_posts.
+        # Хвост -id совпадает с порядком keyset-пагинации.
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='post_pub_date_idx',
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date_idx',
+            ),
+            # Last-Modified RSS-лент, см. feeds.feed_state: MAX(updated)
+            # по каждому из них — один поиск по B-дереву.
+            models.Index(fields=['-updated'], name='post_updated_idx'),
+            models.Index(
+                fields=['author', '-updated'],
+                name='post_author_updated_idx',
+            ),
+            models.Index(
+                fields=['group', '-updated'],
+                name='post_group_updated_idx',
+            ),
+        ]
+
+
+class PostCounterManager(models.Manager):
+    def _scope_filter(self, scope, object_id):
+        if scope == PostCounter.AUTHOR:
+            return {'author_id': object_id}
+        if scope == PostCounter.GROUP:
+            return {'group_id': object_id}
+        return {}
+
+    def _recount(self, scope, object_id):
+        """Пересчитывает отсутствующий счётчик и сохраняет его."""
+        if scope == PostCounter.FOLLOWERS:
+            count = Follow.objects.filter(author_id=object_id).count()
+        else:
+            count = Post.objects.filter(
+                **self._scope_filter(scope, object_id)).count()
+        try:
+            with transaction.atomic():
+                self.create(scope=scope, object_id=object_id, count=count)
+        except IntegrityError:
+            pass
+        return count
+
+    def get_count(self, scope, object_id=0):
+        count = self.filter(
+            scope=scope, object_id=object_id
+        ).values_list('count', flat=True).first()
+        if count is None:
+            return self._recount(scope, object_id)
+        return count
+
+    def total(self):
+        return self.get_count(PostCounter.ALL)
+
+    def for_author(self, author):
+        return self.get_count(PostCounter.AUTHOR, author.pk)
+
+    def for_group(self, group):
+        return self.get_count(PostCounter.GROUP, group.pk)
+
+    def followers(self, author_id):
+        return self.get_count(PostCounter.FOLLOWERS, author_id)
+
+    def change(self, scope, object_id, delta):
+        updated = self.filter(scope=scope, object_id=object_id).update(
+            count=F('count') + delta)
+        if not updated:
+            self._recount(scope, object_id)
+
+    def change_many(self, deltas, size=400):
+        """Меняет счётчики {(scope, object_id): delta} по UPDATE на delta.
+
+        Отсутствующие счётчики пересчитываются, как в change(). Пары
+        идут кусками: у SQLite есть предел параметров.
+        """
+        by_delta = defaultdict(list)
+        for key, delta in deltas.items():
+            if delta:
+                by_delta[delta].append(key)
+        for delta, keys in by_delta.items():
+            for start in range(0, len(keys), size):
+                chunk = keys[start:start + size]
+                condition = reduce(or_, (
+                    Q(scope=scope, object_id=object_id)
+                    for scope, object_id in chunk
+                ))
+                updated = self.filter(condition).update(
+                    count=F('count') + delta)
+                if updated == len(chunk):
+                    continue
+                existing = set(
+                    self.filter(condition).values_list('scope', 'object_id'))
+                for scope, object_id in chunk:
+                    if (scope, object_id) not in existing:
+                        self._recount(scope, object_id)
+
+
+class PostCounter(models.Model):
+    """Денормализованное число постов: всего, у автора, в группе."""
+
+    ALL = 'all'
+    AUTHOR = 'author'
+    GROUP = 'group'
+    # Не посты, но та же механика: по числу подписчиков решается,
+    # раскладывать ли посты автора по лентам подписчиков.
+    FOLLOWERS = 'follow'
+    SCOPE_CHOICES = (
+        (ALL, 'Все посты'),
+        (AUTHOR, 'Посты автора'),
+        (GROUP, 'Посты группы'),
+        (FOLLOWERS, 'Подписчики автора'),
+    )
+
+    scope = models.CharField(max_length=6, choices=SCOPE_CHOICES)
+    object_id = models.PositiveIntegerField(default=0)
+    count = models.IntegerField(default=0)
+
+    objects = PostCounterManager()
+
+    def __str__(self):
+        return f'{self.scope}:{self.object_id}={self.count}'
+
+    class Meta:
+        unique_together = ('scope', 'object_id')
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        verbose_name='Подписчик',
+        on_delete=models.CASCADE,
+        related_name='follower',
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name='Автор',
+        on_delete=models.CASCADE,
+        related_name='following',
+    )
+
+    def __str__(self):
+        return f'{self.user_id} → {self.author_id}'
+
+    class Meta:
+        unique_together = ('user', 'author')
+
+
+class TimelineEntry(models.Model):
+    """Пост в ленте подписок пользователя: раскладывается при записи.
+
+    pub_date и author копируются из поста, чтобы страница ленты
+    читалась одним диапазоном индекса (user, pub_date, post).
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='timeline')
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name='+')
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='+')
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'post')
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='timeline_user_pub_date_idx',
+            ),
+        ]
+
+
+class ImportCheckpoint(models.Model):
+    """Докуда импортирован файл: пишется в одной транзакции с пачкой."""
+
+    source = models.CharField(max_length=255, unique=True)
+    offset = models.BigIntegerField(default=0)
+    rows = models.BigIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.source}: {self.rows}'
@@ -1,13 +1,160 @@
-from django.core.paginator import Paginator
-# from . models import Post
-# from . views import POST_LIMIT
+import base64
+import binascii
+
 from django.conf import settings
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .models import PostCounter
+
+CURSOR_NEXT = 'n'
+CURSOR_PREV = 'p'
+CURSOR_ORDERING = ('-pub_date', '-id')
+
+
+def pack_cursor(*parts):
+    """Упаковывает позицию в ленте в непрозрачную строку для URL."""
+    raw = '|'.join(map(str, parts)).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def unpack_cursor(cursor):
+    """Распаковывает курсор в список строк; для битого — None."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        return base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def encode_cursor(direction, pub_date, pk):
+    return pack_cursor(direction, pub_date.isoformat(), pk)
+
+
+def decode_cursor(cursor):
+    """Курсор ленты: (направление, pub_date, id) или None."""
+    parts = unpack_cursor(cursor)
+    try:
+        direction, pub_date, pk = parts
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (TypeError, ValueError):
+        return None
+    if direction not in (CURSOR_NEXT, CURSOR_PREV) or pub_date is None:
+        return None
+    return direction, pub_date, pk
+
+
+class CursorPage(Page):
+    """Страница ленты, построенная по курсору, а не по номеру."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, next_cursor, prev_cursor):
+        super().__init__(object_list, None, paginator)
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def __repr__(self):
+        return '<Cursor page>'
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+
+class CursorPaginator(Paginator):
+    """Keyset-пагинация по (pub_date, id) без OFFSET и COUNT(*).
+
+    Каждая страница — один запрос вида
+    ``WHERE (pub_date, id) < (:pub_date, :id) ORDER BY ... LIMIT n + 1``,
+    поэтому время выборки не зависит от глубины страницы. Лишнее
+    условие ``pub_date <= :pub_date`` даёт SQLite границу для поиска
+    по индексу вместо сканирования с фильтром.
+    """
+
+    def __init__(self, object_list, per_page):
+        super().__init__(object_list.order_by(*CURSOR_ORDERING), per_page)
+
+    def cursor_page(self, cursor=None):
+        position = decode_cursor(cursor) if cursor else None
+        if position is None:
+            return self._forward_page(self.object_list, has_prev=False)
+        direction, pub_date, pk = position
+        if direction == CURSOR_NEXT:
+            queryset = self.object_list.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk),
+                pub_date__lte=pub_date,
+            )
+            return self._forward_page(queryset, has_prev=True)
+        queryset = self.object_list.filter(
+            Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, id__gt=pk),
+            pub_date__gte=pub_date,
+        ).order_by('pub_date', 'id')
+        rows = list(queryset[:self.per_page + 1])
+        has_prev = len(rows) > self.per_page
+        rows = rows[:self.per_page][::-1]
+        return self._make_page(rows, has_prev=has_prev, has_next=True)
+
+    def _forward_page(self, queryset, has_prev):
+        rows = list(queryset[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        return self._make_page(rows, has_prev=has_prev, has_next=has_next)
+
+    def _make_page(self, rows, has_prev, has_next):
+        next_cursor = prev_cursor = None
+        if rows and has_next:
+            last = rows[-1]
+            next_cursor = encode_cursor(CURSOR_NEXT, last.pub_date, last.pk)
+        if rows and has_prev:
+            first = rows[0]
+            prev_cursor = encode_cursor(CURSOR_PREV, first.pub_date, first.pk)
+        return CursorPage(rows, self, next_cursor, prev_cursor)
+
+
+class PostCounterPaginator(Paginator):
+    """Берёт число постов из PostCounter, если выборка без фильтров."""
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            return PostCounter.objects.total()
+        return super().count
+
+
+def use_cursor(request):
+    """Курсорный режим: явный ?cursor= или настройка без ?page=."""
+    if 'cursor' in request.GET:
+        return True
+    return (
+        getattr(settings, 'POST_PAGINATION', 'offset') == 'cursor'
+        and 'page' not in request.GET
+    )
+
 
+def paginate_page(request, queryset, count=None):
+    """Разбивает ленту на страницы.
 
-def paginate_page(request, queryset):
-    paginator = Paginator(queryset, settings.POST_LIMIT)
+    ``count`` — заранее известное число постов (из PostCounter) или
+    функция, которая его вернёт, чтобы Paginator не выполнял COUNT(*).
+    В курсорном режиме число постов не нужно и не запрашивается.
+    """
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    if use_cursor(request):
+        paginator = CursorPaginator(queryset, settings.POST_LIMIT)
+        page_obj = paginator.cursor_page(request.GET.get('cursor'))
+    else:
+        paginator = Paginator(queryset, settings.POST_LIMIT)
+        if callable(count):
+            count = count()
+        if count is not None:
+            paginator.count = count
+        page_obj = paginator.get_page(page_number)
     return {
         'paginator': paginator,
         'page_number': page_number,
@@ -0,0 +1,171 @@
+"""Кэш результатов запросов постов с зависимостями по таблицам.
+
+Post.objects.cached(ttl) помечает queryset: при вычислении его
+результат берётся из кэша по ключу из SQL и параметров. В ключ входят
+поколения всех таблиц из FROM и JOIN, а любой INSERT, UPDATE или
+DELETE в таблицу поднимает её поколение — старые результаты просто
+перестают находиться. Запись ловится execute_wrapper-ом соединения,
+так что update() и bulk_create() учитываются наравне с save().
+
+Поколения таблиц должны видеть все процессы, поэтому кэш включается
+только с общим кэшем (POST_QUERY_CACHE, по умолчанию — SHARED_CACHE).
+"""
+import hashlib
+import re
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, transaction
+
+from core.queries import location_transparent
+
+from .caching import bump_versions, get_versions, version_key
+
+RESULT_PREFIX = 'posts:query'
+READ_TABLES = re.compile(r'\b(?:FROM|JOIN)\s+[`"]?(\w+)[`"]?', re.I)
+WRITTEN_TABLE = re.compile(
+    r'^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE'
+    r'|DELETE\s+FROM)\s+[`"]?(\w+)[`"]?',
+    re.I,
+)
+
+
+class QueryCacheStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.hits = 0
+            self.misses = 0
+
+    def record(self, hit):
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+stats = QueryCacheStats()
+
+
+def exposition():
+    """Счётчики попаданий для /metrics."""
+    return [
+        '# HELP yatube_query_cache_requests_total Обращения к кэшу '
+        'запросов постов.',
+        '# TYPE yatube_query_cache_requests_total counter',
+        f'yatube_query_cache_requests_total{{result="hit"}} {stats.hits}',
+        f'yatube_query_cache_requests_total{{result="miss"}} {stats.misses}',
+    ]
+
+
+def read_tables(sql):
+    return sorted(set(READ_TABLES.findall(sql)))
+
+
+def bump_tables(tables):
+    bump_versions('table', tables)
+
+
+def result_key(queryset):
+    """Ключ результата или None, если запрос заведомо пустой."""
+    try:
+        sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+    except EmptyResultSet:
+        return None
+    keys = [version_key('table', table) for table in read_tables(sql)]
+    versions = get_versions(keys)
+    digest = hashlib.md5(':'.join([
+        queryset.db,
+        queryset._iterable_class.__name__,
+        repr(queryset._fields),
+        sql,
+        repr(params),
+    ]).encode()).hexdigest()
+    return ':'.join(
+        [RESULT_PREFIX, digest] + [str(versions[key]) for key in keys])
+
+
+def fetch(queryset, ttl):
+    """Результат queryset списком: из кэша или из БД с записью в кэш."""
+    key = result_key(queryset)
+    if key is None:
+        return list(queryset._iterable_class(queryset))
+    rows = cache.get(key)
+    stats.record(hit=rows is not None)
+    if rows is None:
+        rows = list(queryset._iterable_class(queryset))
+        cache.set(key, rows, ttl)
+    return rows
+
+
+def pending_bump(connection):
+    """Отложенный до коммита сброс таблиц текущей транзакции."""
+    flush = getattr(connection, '_query_cache_flush', None)
+    if flush is None or all(
+        func is not flush for _, func in connection.run_on_commit
+    ):
+        tables = set()
+
+        def flush():
+            bump_tables(tables)
+
+        flush.tables = tables
+        connection._query_cache_flush = flush
+        transaction.on_commit(flush, using=connection.alias)
+    return flush
+
+
+@location_transparent
+def track_writes(execute, sql, params, many, context):
+    result = execute(sql, params, many, context)
+    match = WRITTEN_TABLE.match(sql)
+    if match is not None:
+        table = match.group(1)
+        # Сразу — чтобы транзакция видела свои записи; после коммита —
+        # чтобы чужой запрос, успевший между ними прочитать старые
+        # строки, не оставил их в кэше под новым поколением.
+        bump_tables([table])
+        connection = context['connection']
+        if connection.in_atomic_block:
+            pending_bump(connection).tables.add(table)
+    return result
+
+
+def install(connection, **kwargs):
+    # Без кэша обёртка не нужна: каждый INSERT, UPDATE и DELETE зря
+    # платил бы походом в кэш.
+    if not enabled():
+        uninstall(connection)
+    # В начало списка: QueryRecorder снимает свои обёртки с конца.
+    elif track_writes not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, track_writes)
+
+
+def uninstall(connection):
+    if track_writes in connection.execute_wrappers:
+        connection.execute_wrappers.remove(track_writes)
+
+
+def reinstall(setting, **kwargs):
+    """Следует за POST_QUERY_CACHE, когда его меняют в тестах."""
+    if setting == 'POST_QUERY_CACHE':
+        for connection in connections.all():
+            install(connection)
+
+
+def enabled():
+    return settings.POST_QUERY_CACHE
+
+
+def default_timeout():
+    return settings.POST_QUERY_CACHE_TIMEOUT
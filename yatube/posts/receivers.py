@@ -0,0 +1,281 @@
+from collections import Counter
+
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save)
+from django.dispatch import receiver
+
+from . import thumbnails, timelines
+from .caching import (
+    bump_feeds, bump_versions, bump_versions_on_commit, feed_name)
+from .lookups import authors, groups
+from .models import Follow, Group, Post, PostCounter, User
+from .signals import posts_bulk_created
+
+
+def change_counters(author_id, group_id, delta):
+    deltas = {
+        (PostCounter.ALL, 0): delta,
+        (PostCounter.AUTHOR, author_id): delta,
+    }
+    if group_id is not None:
+        deltas[(PostCounter.GROUP, group_id)] = delta
+    PostCounter.objects.change_many(deltas)
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    if created:
+        change_counters(instance.author_id, instance.group_id, 1)
+    else:
+        old_group_id = getattr(instance, '_loaded_group_id', None)
+        if old_group_id != instance.group_id:
+            deltas = {}
+            if old_group_id is not None:
+                deltas[(PostCounter.GROUP, old_group_id)] = -1
+            if instance.group_id is not None:
+                deltas[(PostCounter.GROUP, instance.group_id)] = 1
+            PostCounter.objects.change_many(deltas)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    change_counters(instance.author_id, instance.group_id, -1)
+
+
+@receiver(posts_bulk_created, sender=Post)
+def count_bulk_created_posts(sender, posts, **kwargs):
+    authors = Counter(post.author_id for post in posts)
+    groups = Counter(
+        post.group_id for post in posts if post.group_id is not None)
+    deltas = {(PostCounter.ALL, 0): len(posts)}
+    deltas.update(
+        ((PostCounter.AUTHOR, author_id), delta)
+        for author_id, delta in authors.items())
+    deltas.update(
+        ((PostCounter.GROUP, group_id), delta)
+        for group_id, delta in groups.items())
+    PostCounter.objects.change_many(deltas)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Group)
+def create_counters(sender, instance, created, using, **kwargs):
+    # Нули заводятся сразу: иначе первый пост или просмотр ленты нового
+    # автора или группы платит за пересчёт отсутствующего счётчика.
+    if not created:
+        return
+    scopes = (
+        (PostCounter.AUTHOR, PostCounter.FOLLOWERS) if sender is User
+        else (PostCounter.GROUP,)
+    )
+    PostCounter.objects.using(using).bulk_create(
+        [
+            PostCounter(scope=scope, object_id=instance.pk, count=0)
+            for scope in scopes
+        ],
+        ignore_conflicts=True,
+    )
+
+
+@receiver(post_delete, sender=User)
+def drop_author_counter(sender, instance, **kwargs):
+    PostCounter.objects.filter(
+        scope__in=(PostCounter.AUTHOR, PostCounter.FOLLOWERS),
+        object_id=instance.pk,
+    ).delete()
+
+
+@receiver(post_delete, sender=Group)
+def drop_group_counter(sender, instance, **kwargs):
+    PostCounter.objects.filter(
+        scope=PostCounter.GROUP, object_id=instance.pk).delete()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def expire_post_card(sender, instance, **kwargs):
+    bump_versions_on_commit('post', [instance.pk])
+
+
+def expire_thumbnail_card(post_id):
+    # Карточка с оригиналом картинки сменяется карточкой с миниатюрой.
+    bump_versions('post', [post_id])
+
+
+@receiver(post_save, sender=Post)
+def prepare_thumbnails(sender, instance, **kwargs):
+    if instance.image and not thumbnails.thumbnails_ready(
+            instance.image.name):
+        thumbnails.schedule_thumbnails(instance, expire_thumbnail_card)
+
+
+@receiver(post_save, sender=Post)
+def delete_replaced_image(sender, instance, **kwargs):
+    old_name = getattr(instance, '_loaded_image', None)
+    if old_name and old_name != instance.image.name:
+        thumbnails.schedule_delete(old_name)
+
+
+@receiver(post_delete, sender=Post)
+def delete_post_image(sender, instance, **kwargs):
+    if instance.image:
+        thumbnails.schedule_delete(instance.image.name)
+
+
+@receiver(posts_bulk_created, sender=Post)
+def expire_bulk_post_cards(sender, posts, **kwargs):
+    # На SQLite bulk_create не возвращает pk, но у новых постов и нет
+    # закэшированных карточек.
+    bump_versions_on_commit(
+        'post', [post.pk for post in posts if post.pk is not None])
+
+
+@receiver(post_save, sender=User)
+def expire_author_cards(sender, instance, update_fields=None, **kwargs):
+    # Вход пользователя сохраняет только last_login — карточки не меняются.
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    bump_versions_on_commit('author', [instance.pk])
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def expire_group_cards(sender, instance, **kwargs):
+    bump_versions_on_commit('group', [instance.pk])
+
+
+def chunked_values(queryset, pks, field, size=500):
+    """values_list по pk__in кусками: у SQLite есть предел параметров."""
+    pks = list(pks)
+    values = []
+    for start in range(0, len(pks), size):
+        values.extend(queryset.filter(
+            pk__in=pks[start:start + size]
+        ).values_list(field, flat=True))
+    return values
+
+
+def post_feeds(author_ids, group_ids):
+    """Имена лент, где показываются посты этих авторов и групп."""
+    usernames = chunked_values(User.objects, author_ids, 'username')
+    slugs = chunked_values(
+        Group.objects, [pk for pk in group_ids if pk is not None], 'slug')
+    return (
+        [feed_name('posts:index')]
+        + [feed_name('posts:profile', username) for username in usernames]
+        + [feed_name('posts:group_posts', slug) for slug in slugs]
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def expire_post_feeds(sender, instance, **kwargs):
+    author_ids = {instance.author_id}
+    group_ids = {
+        instance.group_id, getattr(instance, '_loaded_group_id', None)}
+    feeds = []
+    # Уже загруженные автор и группа не стоят лишних запросов.
+    if Post.author.is_cached(instance):
+        author_ids.clear()
+        feeds.append(feed_name('posts:profile', instance.author.username))
+    if instance.group_id is not None and Post.group.is_cached(instance):
+        group_ids.discard(instance.group_id)
+        feeds.append(feed_name('posts:group_posts', instance.group.slug))
+    bump_feeds(feeds + post_feeds(author_ids, group_ids))
+
+
+@receiver(posts_bulk_created, sender=Post)
+def expire_bulk_post_feeds(sender, posts, **kwargs):
+    bump_feeds(post_feeds(
+        {post.author_id for post in posts},
+        {post.group_id for post in posts},
+    ))
+
+
+def author_feeds(author, usernames):
+    """Ленты, где видно имя автора: главная, профиль и его группы."""
+    slugs = Group.objects.filter(
+        posts__author=author).values_list('slug', flat=True).distinct()
+    return (
+        [feed_name('posts:index')]
+        + [feed_name('posts:profile', name) for name in usernames if name]
+        + [feed_name('posts:group_posts', slug) for slug in slugs]
+    )
+
+
+def group_feeds(group, slugs):
+    """Ленты, где видна группа: главная, её лента и профили авторов."""
+    usernames = User.objects.filter(
+        posts__group=group).values_list('username', flat=True).distinct()
+    return (
+        [feed_name('posts:index')]
+        + [feed_name('posts:group_posts', slug) for slug in slugs if slug]
+        + [feed_name('posts:profile', name) for name in usernames]
+    )
+
+
+# Ленты собираются до записи: в post_save ObjectLookup уже забыл
+# прежние username и slug, а после удаления группы её посты без группы.
+@receiver(pre_save, sender=User)
+def collect_author_feeds(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding or (
+        update_fields is not None and set(update_fields) <= {'last_login'}
+    ):
+        return
+    instance._stale_feeds = author_feeds(
+        instance, {getattr(instance, authors.loaded_attr, None)})
+
+
+@receiver(post_save, sender=User)
+def expire_author_feeds(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    feeds = instance.__dict__.pop(
+        '_stale_feeds', [feed_name('posts:index')])
+    bump_feeds(feeds + [feed_name('posts:profile', instance.username)])
+
+
+@receiver(pre_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def collect_group_feeds(sender, instance, **kwargs):
+    if not instance._state.adding:
+        instance._stale_feeds = group_feeds(
+            instance, {getattr(instance, groups.loaded_attr, None)})
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def expire_group_feed(sender, instance, **kwargs):
+    feeds = instance.__dict__.pop('_stale_feeds', [])
+    bump_feeds(feeds + [feed_name('posts:group_posts', instance.slug)])
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, **kwargs):
+    # bulk_create не раскладывается: на SQLite у таких постов нет pk.
+    if created:
+        timelines.schedule_fan_out(instance)
+
+
+@receiver(post_save, sender=Follow)
+def follow_author(sender, instance, created, **kwargs):
+    if created:
+        PostCounter.objects.change(
+            PostCounter.FOLLOWERS, instance.author_id, 1)
+        timelines.backfill(instance.user_id, instance.author_id)
+        expire_follow_state(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def unfollow_author(sender, instance, **kwargs):
+    PostCounter.objects.change(PostCounter.FOLLOWERS, instance.author_id, -1)
+    timelines.forget(instance.user_id, instance.author_id)
+    expire_follow_state(instance)
+
+
+def expire_follow_state(follow):
+    # Кнопка «Подписаться» на профиле входит в его ETag через ленту.
+    bump_feeds([
+        feed_name('posts:profile', username) for username in
+        chunked_values(User.objects, [follow.author_id], 'username')
+    ])
@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.db import connection
+
+from .models import Post
+from .paginators import (
+    CursorPage, CursorPaginator, pack_cursor, unpack_cursor
+)
+
+FTS_TABLE = 'posts_post_fts'
+
+_fts_available = {}
+
+
+def fts_available():
+    """Есть ли в текущей базе FTS5-индекс постов (кэшируется на процесс)."""
+    key = connection.settings_dict['NAME']
+    if key not in _fts_available:
+        available = False
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = %s",
+                    [FTS_TABLE]
+                )
+                available = cursor.fetchone() is not None
+        _fts_available[key] = available
+    return _fts_available[key]
+
+
+def match_expression(query):
+    """Каждое слово — отдельная фраза FTS5: спецсимволы не ломают MATCH."""
+    terms = query.split()
+    return ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def ranked_ids(query, after=None, limit=None):
+    """id постов по релевантности bm25 с keyset-продолжением.
+
+    ``after`` — пара (rank, id) последнего поста предыдущей страницы.
+    """
+    sql = f'SELECT rowid, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+    params = [match_expression(query)]
+    if after is not None:
+        sql += ' AND (rank > %s OR (rank = %s AND rowid > %s))'
+        params += [after[0], after[0], after[1]]
+    sql += ' ORDER BY rank, rowid'
+    if limit is not None:
+        sql += ' LIMIT %s'
+        params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def decode_rank_cursor(cursor):
+    parts = unpack_cursor(cursor) if cursor else None
+    try:
+        rank, pk = parts
+        return float(rank), int(pk)
+    except (TypeError, ValueError):
+        return None
+
+
+def search_page(query, cursor=None):
+    """Страница результатов поиска; без FTS5 — LIKE по свежим постам."""
+    limit = settings.POST_LIMIT
+    posts = Post.objects.select_related('author', 'group')
+    if not fts_available():
+        paginator = CursorPaginator(posts.filter(text__icontains=query), limit)
+        return paginator.cursor_page(cursor)
+    rows = ranked_ids(query, decode_rank_cursor(cursor), limit + 1)
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+    found = posts.in_bulk([pk for pk, _ in rows])
+    object_list = [found[pk] for pk, _ in rows if pk in found]
+    next_cursor = None
+    if has_next:
+        last_pk, last_rank = rows[-1]
+        next_cursor = pack_cursor(repr(last_rank), last_pk)
+    return CursorPage(object_list, None, next_cursor, None)
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Отправляется из PostQuerySet.bulk_create: обычные post_save
+# при пакетной вставке не срабатывают.
+posts_bulk_created = Signal(providing_args=['posts'])
@@ -0,0 +1,44 @@
+from django import template
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from posts.caching import card_keys, card_timeout
+from posts.thumbnails import thumbnail_url
+
+register = template.Library()
+
+CARDS_STATE = 'post_cards'
+
+
+def page_cards(context, post):
+    """Ключи и готовые карточки всей страницы за два обращения к кэшу."""
+    state = context.render_context.get(CARDS_STATE)
+    if state is None or post.pk not in state['keys']:
+        posts = list(context.get('page_obj') or ())
+        if post not in posts:
+            posts = [post]
+        keys = card_keys(posts)
+        state = {'keys': keys, 'html': cache.get_many(keys.values())}
+        context.render_context[CARDS_STATE] = state
+    return state
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post):
+    """Карточка поста из кэша фрагментов; промах рендерит и кладёт."""
+    state = page_cards(context, post)
+    key = state['keys'][post.pk]
+    html = state['html'].get(key)
+    if html is None:
+        html = render_to_string(
+            'posts/includes/post_card.html', {'post': post})
+        cache.set(key, html, card_timeout())
+        state['html'][key] = html
+    return mark_safe(html)
+
+
+@register.simple_tag
+def post_thumbnail(post, alias):
+    """Готовая миниатюра или оригинал: рендер не ждёт нарезки."""
+    return thumbnail_url(post.image, alias)
@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+RANGE_POSTS = 30
+RANGE_GROUPS = 5
+
+
+class PostAdminChangelistTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+        groups = [
+            Group.objects.create(
+                title=f'Группа {num}',
+                slug=f'group_{num}',
+                description='Описание',
+            )
+            for num in range(RANGE_GROUPS)
+        ]
+        Post.objects.bulk_create(
+            Post(
+                text=f'Пост {num}',
+                author=cls.admin,
+                group=groups[num % RANGE_GROUPS],
+            )
+            for num in range(RANGE_POSTS)
+        )
+        cls.CHANGELIST_URL = '/admin/posts/post/'
+
+    def setUp(self):
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+
+    def changelist_queries(self, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.admin_client.get(self.CHANGELIST_URL, params)
+        self.assertEqual(response.status_code, 200)
+        return response, [query['sql'] for query in queries]
+
+    def test_changelist_query_count_does_not_grow_with_rows(self):
+        _, queries = self.changelist_queries()
+        group_queries = [
+            sql for sql in queries if sql.startswith(
+                'SELECT "posts_group"."id"')
+        ]
+        self.assertEqual(len(group_queries), 1)
+        self.assertLess(len(queries), 10)
+
+    def test_unfiltered_changelist_skips_count(self):
+        response, queries = self.changelist_queries()
+        counts = [
+            sql for sql in queries
+            if 'COUNT(*)' in sql and 'FROM "posts_post"' in sql
+        ]
+        self.assertEqual(counts, [])
+        self.assertEqual(response.context['cl'].result_count, RANGE_POSTS)
+
+    def test_filtered_changelist_counts_matching_rows(self):
+        response, _ = self.changelist_queries({'q': 'Пост 1'})
+        self.assertEqual(response.context['cl'].result_count, 1)
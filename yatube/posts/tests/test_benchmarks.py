@@ -0,0 +1,46 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..management.commands.benchmark_views import percentile
+from ..models import Group, Post, PostCounter
+
+
+class BenchmarkCommandsTests(TestCase):
+    def test_seed_posts_creates_skewed_dataset(self):
+        call_command(
+            'seed_posts', posts=500, groups=5, authors=20, batch_size=200,
+            stdout=StringIO(),
+        )
+        self.assertEqual(Post.objects.count(), 500)
+        self.assertEqual(Group.objects.count(), 5)
+        self.assertEqual(PostCounter.objects.total(), 500)
+        top = PostCounter.objects.filter(
+            scope=PostCounter.AUTHOR).order_by('-count').first()
+        self.assertGreater(top.count, 500 / 20)
+        dates = Post.objects.values_list('pub_date', flat=True)
+        self.assertGreater(len(set(dates)), 1)
+
+    def test_benchmark_views_writes_report(self):
+        call_command(
+            'seed_posts', posts=100, groups=3, authors=5, stdout=StringIO())
+        output = StringIO()
+        call_command(
+            'benchmark_views', requests=5, stdout=output, stderr=StringIO())
+        report = json.loads(output.getvalue())
+        self.assertEqual(report['meta']['posts'], 100)
+        self.assertEqual(Post.objects.count(), 100)
+        self.assertEqual(
+            report['views']['posts:post_create']['statuses'], {'302': 5})
+        for view, stats in report['views'].items():
+            with self.subTest(view=view):
+                self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+                self.assertGreater(stats['max_queries'], 0)
+
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([7], 0.95), 7)
@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from ..caching import card_keys
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth', first_name='Лев', last_name='Толстой')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.INDEX_URL = reverse('posts:index')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.post = Post.objects.create(
+            text='Тестовый пост', author=self.user, group=self.group)
+
+    def get_index(self):
+        return self.authorized_client.get(self.INDEX_URL).content.decode()
+
+    def test_card_is_served_from_cache(self):
+        self.get_index()
+        Post.objects.filter(pk=self.post.pk).update(text='Без сигнала')
+        html = self.get_index()
+        self.assertIn('Тестовый пост', html)
+        self.assertNotIn('Без сигнала', html)
+
+    def test_cards_live_seconds_without_shared_cache(self):
+        # Сигнал сбрасывает карточку только в своём процессе.
+        if not settings.SHARED_CACHE:
+            self.assertLessEqual(settings.POST_CARD_CACHE_TIMEOUT, 5)
+
+    def test_post_save_expires_card(self):
+        self.get_index()
+        self.post.text = 'Новый текст'
+        self.post.save()
+        self.assertIn('Новый текст', self.get_index())
+
+    def test_author_rename_expires_card(self):
+        self.get_index()
+        self.user.first_name = 'Фёдор'
+        self.user.save()
+        self.assertIn('Фёдор Толстой', self.get_index())
+
+    def test_group_change_expires_card(self):
+        self.get_index()
+        self.group.slug = 'new_slug'
+        self.group.save()
+        self.assertIn(
+            reverse('posts:group_posts', kwargs={'slug': 'new_slug'}),
+            self.get_index()
+        )
+
+
+class PostCardCommitTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='auth')
+        self.post = Post.objects.create(text='Тестовый пост', author=self.user)
+
+    def test_card_cached_before_commit_is_expired_after(self):
+        with transaction.atomic():
+            self.post.text = 'Новый текст'
+            self.post.save()
+            # Чужой запрос ещё видит старые строки и кэширует карточку.
+            stale_key = card_keys([self.post])[self.post.pk]
+        self.assertNotEqual(card_keys([self.post])[self.post.pk], stale_key)
@@ -0,0 +1,122 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+@override_settings(CONDITIONAL_PAGES=True)
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.INDEX_URL = reverse('posts:index')
+        cls.GROUP_LIST_URL = reverse(
+            'posts:group_posts', kwargs={'slug': cls.group.slug})
+        cls.PROFILE_URL = reverse(
+            'posts:profile', kwargs={'username': cls.user.username})
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.post = Post.objects.create(
+            text='Тестовый пост', author=self.user, group=self.group)
+        self.POST_DETAIL_URL = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk})
+
+    def revalidate(self, client, url):
+        etag = client.get(url)['ETag']
+        return client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_pages_are_not_rendered_again(self):
+        urls = (
+            self.INDEX_URL,
+            self.GROUP_LIST_URL,
+            self.PROFILE_URL,
+            self.POST_DETAIL_URL,
+        )
+        for client in (self.guest_client, self.authorized_client):
+            for url in urls:
+                with self.subTest(url=url):
+                    response = self.revalidate(client, url)
+                    self.assertEqual(response.status_code, 304)
+                    self.assertIsNone(response.context)
+
+    def test_etag_depends_on_viewer(self):
+        etag = self.guest_client.get(self.POST_DETAIL_URL)['ETag']
+        response = self.authorized_client.get(
+            self.POST_DETAIL_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_edit_changes_post_validators(self):
+        pub_date = self.post.pub_date
+        response = self.guest_client.get(self.POST_DETAIL_URL)
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Исправленный пост', 'group': self.group.pk},
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.pub_date, pub_date)
+        self.assertGreater(self.post.updated, pub_date)
+        response = self.guest_client.get(
+            self.POST_DETAIL_URL, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertContains(response, 'Исправленный пост')
+
+    def test_new_post_changes_feed_validators(self):
+        etag = self.guest_client.get(self.GROUP_LIST_URL)['ETag']
+        Post.objects.create(
+            text='Свежий пост', author=self.user, group=self.group)
+        response = self.guest_client.get(
+            self.GROUP_LIST_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Свежий пост')
+
+    def assertFeedsChanged(self, urls, change):
+        etags = {url: self.guest_client.get(url)['ETag'] for url in urls}
+        change()
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_group_rename_changes_feed_validators(self):
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        self.assertFeedsChanged(
+            (self.INDEX_URL, self.PROFILE_URL), group.save)
+
+    def test_group_delete_changes_feed_validators(self):
+        group = Group.objects.get(pk=self.group.pk)
+        self.assertFeedsChanged(
+            (self.INDEX_URL, self.PROFILE_URL), group.delete)
+
+    def test_author_rename_changes_feed_validators(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Лев'
+        self.assertFeedsChanged(
+            (self.INDEX_URL, self.GROUP_LIST_URL), user.save)
+
+    def test_page_number_is_part_of_etag(self):
+        etag = self.guest_client.get(self.INDEX_URL)['ETag']
+        response = self.guest_client.get(
+            self.INDEX_URL, {'page': 2}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(CONDITIONAL_PAGES=False)
+    def test_no_validators_without_shared_cache(self):
+        for url in (self.INDEX_URL, self.POST_DETAIL_URL):
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertFalse(response.has_header('ETag'))
+                self.assertFalse(response.has_header('Last-Modified'))
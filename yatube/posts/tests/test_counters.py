@@ -0,0 +1,104 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Follow, Group, Post, PostCounter
+
+User = get_user_model()
+
+
+class PostCounterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.group2 = Group.objects.create(
+            title='Тестовая группа 2',
+            slug='test_slug2',
+            description='Тестовое описание 2',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def assertCounters(self, total, author, group, group2=0):
+        counters = (
+            (PostCounter.objects.total(), total),
+            (PostCounter.objects.for_author(self.user), author),
+            (PostCounter.objects.for_group(self.group), group),
+            (PostCounter.objects.for_group(self.group2), group2),
+        )
+        for value, expected in counters:
+            with self.subTest(expected=expected):
+                self.assertEqual(value, expected)
+
+    def test_counters_follow_create_move_and_delete(self):
+        post = Post.objects.create(
+            text='Тестовый пост', author=self.user, group=self.group)
+        Post.objects.create(text='Без группы', author=self.user)
+        self.assertCounters(total=2, author=2, group=1)
+        post = Post.objects.get(pk=post.pk)
+        post.group = self.group2
+        post.save()
+        self.assertCounters(total=2, author=2, group=0, group2=1)
+        post.delete()
+        self.assertCounters(total=1, author=1, group=0)
+
+    def test_bulk_create_updates_counters(self):
+        Post.objects.bulk_create(
+            Post(text=f'Пост {num}', author=self.user, group=self.group)
+            for num in range(5)
+        )
+        self.assertCounters(total=5, author=5, group=5)
+
+    def test_new_author_and_group_start_with_zero_counters(self):
+        author = User.objects.create_user(username='new')
+        group = Group.objects.create(
+            title='Новая группа', slug='new_slug', description='Описание')
+        with self.assertNumQueries(3):
+            self.assertEqual(PostCounter.objects.for_author(author), 0)
+            self.assertEqual(PostCounter.objects.followers(author.pk), 0)
+            self.assertEqual(PostCounter.objects.for_group(group), 0)
+
+    def test_missing_counter_is_recounted_with_the_rest(self):
+        Post.objects.create(
+            text='Тестовый пост', author=self.user, group=self.group)
+        PostCounter.objects.filter(scope=PostCounter.AUTHOR).delete()
+        Post.objects.create(
+            text='Второй пост', author=self.user, group=self.group)
+        self.assertCounters(total=2, author=2, group=2)
+
+    def test_rebuild_command_restores_counters(self):
+        Post.objects.create(
+            text='Тестовый пост', author=self.user, group=self.group)
+        PostCounter.objects.update(count=100)
+        call_command('rebuild_post_counters', stdout=StringIO())
+        self.assertCounters(total=1, author=1, group=1)
+
+    def test_rebuild_command_keeps_follower_counters(self):
+        follower = User.objects.create_user(username='follower')
+        Follow.objects.create(user=follower, author=self.user)
+        call_command('rebuild_post_counters', stdout=StringIO())
+        self.assertEqual(
+            PostCounter.objects.filter(
+                scope=PostCounter.FOLLOWERS, object_id=self.user.pk,
+            ).values_list('count', flat=True).get(),
+            1,
+        )
+
+    def test_profile_reads_counter_instead_of_count(self):
+        Post.objects.create(text='Тестовый пост', author=self.user)
+        response = self.guest_client.get(
+            reverse('posts:profile', kwargs={'username': 'auth'}))
+        self.assertEqual(response.context['posts_count'], 1)
+        self.assertEqual(response.context['paginator'].count, 1)
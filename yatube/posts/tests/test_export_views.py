@@ -0,0 +1,79 @@
+import csv
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+RANGE_POSTS = 5
+
+
+class FeedExportViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Пост {num}', author=cls.user, group=cls.group)
+            for num in range(RANGE_POSTS)
+        )
+        Post.objects.create(text='Чужой пост', author=cls.other)
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def export(self, name, fmt, **kwargs):
+        response = self.guest_client.get(
+            reverse(f'posts:{name}', kwargs={'fmt': fmt, **kwargs}))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        with CaptureQueriesContext(connection) as queries:
+            body = b''.join(response.streaming_content).decode()
+        self.assertEqual(len(queries), 1)
+        columns = queries[0]['sql'].split(' FROM ')[0]
+        self.assertEqual(columns.count(', '), 4)
+        return response, body
+
+    def test_profile_export_jsonl(self):
+        response, body = self.export(
+            'profile_export', 'jsonl', username=self.user.username)
+        records = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(
+            [record['text'] for record in records],
+            [f'Пост {num}' for num in range(RANGE_POSTS)]
+        )
+        self.assertEqual(records[0]['group'], self.group.slug)
+        self.assertIn('profile-auth.jsonl', response['Content-Disposition'])
+
+    def test_group_export_csv(self):
+        response, body = self.export(
+            'group_export', 'csv', slug=self.group.slug)
+        rows = list(csv.DictReader(StringIO(body)))
+        self.assertEqual(len(rows), RANGE_POSTS)
+        self.assertEqual({row['author'] for row in rows}, {'auth'})
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+
+    def test_unknown_format_or_owner_is_404(self):
+        urls = (
+            reverse('posts:group_export',
+                    kwargs={'slug': self.group.slug, 'fmt': 'xml'}),
+            reverse('posts:profile_export',
+                    kwargs={'username': 'nobody', 'fmt': 'csv'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.guest_client.get(url).status_code, 404)
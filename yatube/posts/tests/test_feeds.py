@@ -0,0 +1,90 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.FEED_URLS = (
+            reverse('posts:index_rss'),
+            reverse('posts:index_atom'),
+            reverse('posts:group_rss', kwargs={'slug': cls.group.slug}),
+            reverse('posts:group_atom', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile_rss',
+                    kwargs={'username': cls.user.username}),
+            reverse('posts:profile_atom',
+                    kwargs={'username': cls.user.username}),
+        )
+        cls.GROUP_RSS_URL = cls.FEED_URLS[2]
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.post = Post.objects.create(
+            text='Пост в ленте', author=self.user, group=self.group)
+
+    def test_feeds_list_posts_with_validators(self):
+        for url in self.FEED_URLS:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertContains(response, 'Пост в ленте')
+                self.assertTrue(response.has_header('ETag'))
+                self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_unchanged_poll_is_304_without_loading_posts(self):
+        for url in self.FEED_URLS:
+            with self.subTest(url=url):
+                etag = self.guest_client.get(url)['ETag']
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertLessEqual(len(queries), 3)
+                for query in queries:
+                    self.assertNotIn('"posts_post"."text"', query['sql'])
+
+    def test_if_modified_since_is_honoured(self):
+        last_modified = self.guest_client.get(
+            self.GROUP_RSS_URL)['Last-Modified']
+        response = self.guest_client.get(
+            self.GROUP_RSS_URL, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_new_and_deleted_posts_change_etag(self):
+        etag = self.guest_client.get(self.GROUP_RSS_URL)['ETag']
+        Post.objects.create(
+            text='Ещё пост', author=self.user, group=self.group)
+        response = self.guest_client.get(
+            self.GROUP_RSS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Ещё пост')
+        self.post.delete()
+        self.assertNotEqual(
+            self.guest_client.get(self.GROUP_RSS_URL)['ETag'],
+            response['ETag']
+        )
+
+    def test_edited_post_changes_etag(self):
+        etag = self.guest_client.get(self.GROUP_RSS_URL)['ETag']
+        self.post.text = 'Исправленный пост'
+        self.post.save()
+        response = self.guest_client.get(
+            self.GROUP_RSS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Исправленный пост')
+
+    def test_unknown_group_is_404(self):
+        response = self.guest_client.get(
+            reverse('posts:group_rss', kwargs={'slug': 'missing'}))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,127 @@
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from ..models import Follow, Post, PostCounter, TimelineEntry
+from ..timelines import timeline_page
+
+User = get_user_model()
+
+
+# Раскладка постов идёт после коммита — нужны настоящие транзакции.
+class FollowTimelineTests(TransactionTestCase):
+    FOLLOW_INDEX_URL = reverse('posts:follow_index')
+
+    def setUp(self):
+        cache.clear()
+        self.reader = User.objects.create_user(username='reader')
+        self.author = User.objects.create_user(username='author')
+        self.star = User.objects.create_user(username='star')
+        self.stranger = User.objects.create_user(username='stranger')
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def follow(self, user, author):
+        Follow.objects.create(user=user, author=author)
+
+    def walk(self, user):
+        ids, cursor = [], None
+        while True:
+            page_obj = timeline_page(user, cursor)
+            ids.extend(post.pk for post in page_obj)
+            if not page_obj.has_next():
+                return ids
+            cursor = page_obj.next_cursor
+
+    def test_follow_and_unfollow_views(self):
+        self.reader_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': 'author'}))
+        self.reader_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': 'reader'}))
+        self.assertEqual(
+            list(Follow.objects.values_list('user', 'author')),
+            [(self.reader.pk, self.author.pk)]
+        )
+        self.assertEqual(
+            PostCounter.objects.followers(self.author.pk), 1)
+        response = self.reader_client.get(reverse(
+            'posts:profile', kwargs={'username': 'author'}))
+        self.assertTrue(response.context['following'])
+        self.reader_client.get(reverse(
+            'posts:profile_unfollow', kwargs={'username': 'author'}))
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(
+            PostCounter.objects.followers(self.author.pk), 0)
+
+    def test_new_post_is_pushed_to_followers_only(self):
+        self.follow(self.reader, self.author)
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.reader, post=post).exists())
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.stranger).exists())
+        response = self.reader_client.get(self.FOLLOW_INDEX_URL)
+        self.assertEqual(list(response.context['page_obj']), [post])
+        stranger_client = Client()
+        stranger_client.force_login(self.stranger)
+        response = stranger_client.get(self.FOLLOW_INDEX_URL)
+        self.assertEqual(len(response.context['page_obj']), 0)
+
+    def test_follow_backfills_and_unfollow_forgets(self):
+        post = Post.objects.create(text='Старый пост', author=self.author)
+        self.follow(self.reader, self.author)
+        self.assertEqual(list(timeline_page(self.reader)), [post])
+        Follow.objects.filter(user=self.reader).delete()
+        self.assertEqual(list(timeline_page(self.reader)), [])
+
+    def test_timeline_page_is_one_range_read(self):
+        self.follow(self.reader, self.author)
+        Post.objects.create(text='Пост', author=self.author)
+        # Страница ленты и проверка «звёзд» среди подписок.
+        with self.assertNumQueries(2):
+            list(timeline_page(self.reader))
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=2)
+    def test_star_posts_are_merged_on_read(self):
+        self.follow(self.reader, self.author)
+        self.follow(self.reader, self.star)
+        self.follow(self.stranger, self.star)
+        posts = []
+        for num in range(settings.POST_LIMIT + 5):
+            author = self.star if num % 3 else self.author
+            posts.append(
+                Post.objects.create(text=f'Пост {num}', author=author))
+        self.assertFalse(
+            TimelineEntry.objects.filter(author=self.star).exists())
+        self.assertEqual(
+            self.walk(self.reader), [post.pk for post in reversed(posts)])
+
+    @override_settings(TIMELINE_LENGTH=3, TIMELINE_TRIM_EVERY=1)
+    def test_timeline_is_bounded(self):
+        self.follow(self.reader, self.author)
+        self.follow(self.stranger, self.author)
+        posts = [
+            Post.objects.create(text=f'Пост {num}', author=self.author)
+            for num in range(5)
+        ]
+        for user in (self.reader, self.stranger):
+            with self.subTest(user=user):
+                self.assertEqual(
+                    TimelineEntry.objects.filter(user=user).count(), 3)
+        self.assertEqual(
+            self.walk(self.reader), [post.pk for post in posts[:1:-1]])
+
+    @override_settings(TIMELINE_LENGTH=3, TIMELINE_TRIM_EVERY=1)
+    def test_timeline_is_bounded_without_window_functions(self):
+        self.follow(self.reader, self.author)
+        with mock.patch.object(
+                connection.features, 'supports_over_clause', False):
+            for num in range(5):
+                Post.objects.create(text=f'Пост {num}', author=self.author)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 3)
@@ -0,0 +1,101 @@
+import csv
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import Group, ImportCheckpoint, Post, PostCounter
+
+User = get_user_model()
+
+RANGE_POSTS = 7
+
+
+class ImportExportCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        Post.objects.bulk_create(
+            Post(
+                text=f'Пост {num}\nвторая строка, "в кавычках"',
+                author=self.user,
+                group=self.group if num % 2 else None,
+            )
+            for num in range(RANGE_POSTS)
+        )
+        self.expected = list(
+            Post.objects.order_by('pk').values_list('text', 'group'))
+        directory = tempfile.mkdtemp()
+        self.addCleanup(os.rmdir, directory)
+        self.path = os.path.join(directory, 'posts')
+
+    def export(self, fmt):
+        path = f'{self.path}.{fmt}'
+        self.addCleanup(os.remove, path)
+        call_command('export_posts', path, stderr=StringIO())
+        return path
+
+    def reimport(self, path, **options):
+        Post.objects.all().delete()
+        call_command('import_posts', path, stdout=StringIO(), **options)
+        return list(
+            Post.objects.order_by('pk').values_list('text', 'group'))
+
+    def test_jsonl_round_trip(self):
+        path = self.export('jsonl')
+        with open(path, encoding='utf-8') as source:
+            first = json.loads(source.readline())
+        self.assertEqual(first['author'], 'auth')
+        self.assertEqual(self.reimport(path, batch_size=3), self.expected)
+
+    def test_csv_round_trip_keeps_multiline_text(self):
+        path = self.export('csv')
+        with open(path, newline='', encoding='utf-8') as source:
+            self.assertEqual(len(list(csv.reader(source))), RANGE_POSTS + 1)
+        self.assertEqual(self.reimport(path, batch_size=3), self.expected)
+        self.assertEqual(PostCounter.objects.total(), RANGE_POSTS)
+
+    def test_unknown_authors_are_skipped(self):
+        path = self.export('jsonl')
+        self.user.username = 'renamed'
+        self.user.save()
+        self.assertEqual(self.reimport(path), [])
+        checkpoint = ImportCheckpoint.objects.get(
+            source=os.path.abspath(path))
+        self.assertEqual(checkpoint.rows, RANGE_POSTS)
+
+    def test_second_run_resumes_after_checkpoint(self):
+        path = self.export('csv')
+        self.reimport(path, batch_size=3)
+        call_command('import_posts', path, stdout=StringIO())
+        self.assertEqual(Post.objects.count(), RANGE_POSTS)
+        call_command('import_posts', path, restart=True, stdout=StringIO())
+        self.assertEqual(Post.objects.count(), RANGE_POSTS * 2)
+
+    def test_interrupted_import_continues_from_last_batch(self):
+        path = self.export('csv')
+        Post.objects.all().delete()
+        with open(path, 'rb') as source:
+            # Заголовок и первый пост: его текст занимает две строки.
+            for _ in range(3):
+                source.readline()
+            offset = source.tell()
+        ImportCheckpoint.objects.create(
+            source=os.path.abspath(path), offset=offset, rows=1)
+        call_command('import_posts', path, stdout=StringIO())
+        self.assertEqual(
+            list(Post.objects.order_by('pk').values_list('text', 'group')),
+            self.expected[1:]
+        )
@@ -0,0 +1,94 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..feeds import feed_state
+from ..models import Group, Post, PostCounter
+
+User = get_user_model()
+
+RANGE_POSTS = 25
+
+
+class FeedQueryPlanTests(TestCase):
+    """EXPLAIN по каждому запросу ленты: индекс и никакой сортировки."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Пост {num}', author=cls.user, group=cls.group)
+            for num in range(RANGE_POSTS)
+        )
+        cls.FEED_URLS = (
+            reverse('posts:index'),
+            reverse('posts:group_posts', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile', kwargs={'username': cls.user.username}),
+        )
+
+    def setUp(self):
+        # Авторизованный клиент идёт мимо кэша страниц, запросы видны.
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def feed_queries(self, url, params):
+        # Страницы группы берутся из кэша запросов — нужен их SQL.
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(url, params)
+            list(response.context['page_obj'])
+        return response, [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "posts_post"' in query['sql']
+        ]
+
+    def query_plan(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return ' | '.join(row[-1] for row in cursor.fetchall())
+
+    def test_feed_queries_use_index_without_temp_sort(self):
+        for url in self.FEED_URLS:
+            first_page, _ = self.feed_queries(url, {'cursor': ''})
+            next_cursor = first_page.context['page_obj'].next_cursor
+            second_page, _ = self.feed_queries(url, {'cursor': next_cursor})
+            prev_cursor = second_page.context['page_obj'].prev_cursor
+            for params in (
+                {'page': 2},
+                {'cursor': next_cursor},
+                {'cursor': prev_cursor},
+            ):
+                _, queries = self.feed_queries(url, params)
+                self.assertTrue(queries)
+                for sql in queries:
+                    plan = self.query_plan(sql)
+                    with self.subTest(url=url, params=params, plan=plan):
+                        self.assertIn('USING INDEX post_', plan)
+                        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_feed_validators_are_single_index_seek(self):
+        scopes = (
+            (PostCounter.ALL, None),
+            (PostCounter.AUTHOR, self.user.pk),
+            (PostCounter.GROUP, self.group.pk),
+        )
+        for scope, object_id in scopes:
+            with CaptureQueriesContext(connection) as queries:
+                feed_state(scope, object_id)
+            sql = next(
+                query['sql'] for query in queries.captured_queries
+                if 'MAX("posts_post"."updated")' in query['sql'])
+            plan = self.query_plan(sql)
+            with self.subTest(scope=scope, plan=plan):
+                self.assertIn('COVERING INDEX post_', plan)
+                self.assertIn('updated_idx', plan)
@@ -0,0 +1,82 @@
+from django.core.cache import cache, caches
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..lookups import authors, groups
+from ..models import Group, User
+
+
+class ObjectLookupTests(TestCase):
+    def setUp(self):
+        self.shared = caches['lookups']
+        self.shared.clear()
+        cache.clear()
+        groups.clear()
+        authors.clear()
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+
+    def test_repeated_lookup_hits_cache(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(groups.get('group'), self.group)
+        with self.assertNumQueries(0):
+            self.assertEqual(groups.get('group'), self.group)
+        self.shared.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(groups.get('group'), self.group)
+
+    def test_missing_value_is_cached_until_created(self):
+        with self.assertNumQueries(1):
+            self.assertIsNone(authors.get('ghost'))
+        with self.assertNumQueries(0):
+            self.assertIsNone(authors.get('ghost'))
+
+        user = User.objects.create_user(username='ghost')
+
+        self.assertEqual(authors.get('ghost'), user)
+
+    def test_rename_expires_old_and_new_value(self):
+        groups.get('group')
+        groups.get('renamed')
+
+        group = Group.objects.get(pk=self.group.pk)
+        group.slug = 'renamed'
+        group.save()
+
+        self.assertIsNone(groups.get('group'))
+        self.assertEqual(groups.get('renamed').slug, 'renamed')
+
+    def test_delete_expires_object(self):
+        groups.get('group')
+
+        self.group.delete()
+
+        self.assertIsNone(groups.get('group'))
+
+    @override_settings(OBJECT_CACHE_SIZE=1)
+    def test_local_cache_is_bounded(self):
+        Group.objects.create(title='Вторая', slug='second', description='')
+        groups.get('group')
+        groups.get('second')
+        self.shared.clear()
+
+        with self.assertNumQueries(0):
+            groups.get('second')
+        with self.assertNumQueries(1):
+            groups.get('group')
+
+    def test_lookups_use_own_cache_alias(self):
+        groups.get('group')
+
+        self.assertIsNotNone(self.shared.get(groups.key('group')))
+        self.assertIsNone(cache.get(groups.key('group')))
+
+    def test_unknown_group_page_skips_database_when_cached(self):
+        url = reverse('posts:group_posts', kwargs={'slug': 'missing'})
+        client = Client()
+        client.get(url)
+
+        with self.assertNumQueries(0):
+            response = client.get(url)
+
+        self.assertEqual(response.status_code, 404)
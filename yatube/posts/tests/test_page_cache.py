@@ -0,0 +1,110 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from ..caching import feed_name, get_versions, version_key
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class FeedPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.INDEX_URL = reverse('posts:index')
+        cls.GROUP_LIST_URL = reverse(
+            'posts:group_posts', kwargs={'slug': cls.group.slug})
+        cls.PROFILE_URL = reverse(
+            'posts:profile', kwargs={'username': cls.user.username})
+        cls.OTHER_PROFILE_URL = reverse(
+            'posts:profile', kwargs={'username': cls.other.username})
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        Post.objects.create(
+            text='Первый пост', author=self.user, group=self.group)
+        Post.objects.create(text='Пост другого автора', author=self.other)
+
+    def test_pages_live_seconds_without_shared_cache(self):
+        # Сигнал сбрасывает страницу только в своём процессе.
+        if not settings.SHARED_CACHE:
+            self.assertLessEqual(settings.FEED_PAGE_CACHE_TIMEOUT, 5)
+
+    def test_anonymous_page_is_cached(self):
+        first = self.guest_client.get(self.INDEX_URL)
+        Post.objects.update(text='Изменено мимо ORM-сигналов')
+        with self.assertNumQueries(0):
+            second = self.guest_client.get(self.INDEX_URL)
+        self.assertEqual(first.content, second.content)
+
+    def test_authorized_user_bypasses_cache(self):
+        self.guest_client.get(self.INDEX_URL)
+        response = self.authorized_client.get(self.INDEX_URL)
+        self.assertIsNotNone(response.context)
+        self.assertContains(response, self.user.username)
+
+    def test_page_number_is_part_of_key(self):
+        self.guest_client.get(self.INDEX_URL)
+        response = self.guest_client.get(self.INDEX_URL, {'page': 2})
+        self.assertIsNotNone(response.context)
+
+    def test_new_post_evicts_only_affected_feeds(self):
+        urls = (
+            self.INDEX_URL,
+            self.GROUP_LIST_URL,
+            self.PROFILE_URL,
+            self.OTHER_PROFILE_URL,
+        )
+        for url in urls:
+            self.guest_client.get(url)
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Свежий пост', 'group': self.group.pk},
+        )
+        evicted = (self.INDEX_URL, self.GROUP_LIST_URL, self.PROFILE_URL)
+        for url in evicted:
+            with self.subTest(url=url):
+                self.assertContains(self.guest_client.get(url), 'Свежий пост')
+        with self.assertNumQueries(0):
+            self.guest_client.get(self.OTHER_PROFILE_URL)
+
+    def test_edit_evicts_old_group_feed(self):
+        post = Post.objects.get(text='Первый пост')
+        self.guest_client.get(self.GROUP_LIST_URL)
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            data={'text': 'Первый пост', 'group': ''},
+        )
+        response = self.guest_client.get(self.GROUP_LIST_URL)
+        self.assertNotContains(response, 'Первый пост')
+
+
+class FeedVersionCommitTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='auth')
+
+    def feed_version(self):
+        key = version_key('feed', feed_name('posts:index'))
+        return get_versions([key])[key]
+
+    def test_feed_cached_before_commit_is_expired_after(self):
+        with transaction.atomic():
+            Post.objects.create(text='Новый пост', author=self.user)
+            # Чужой запрос ещё не видит пост и кэширует ленту без него.
+            stale_version = self.feed_version()
+        self.assertNotEqual(self.feed_version(), stale_version)
@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Post
+from ..paginators import CursorPage, decode_cursor
+
+User = get_user_model()
+
+RANGE_POSTS = 25
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.bulk_create(
+            Post(text=f'Тестовый текст {num}', author=cls.user)
+            for num in range(RANGE_POSTS)
+        )
+        cls.INDEX_URL = reverse('posts:index')
+        cls.expected = list(
+            Post.objects.order_by('-pub_date', '-id').values_list(
+                'id', flat=True)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def walk_forward(self):
+        ids, cursor = [], ''
+        while True:
+            response = self.guest_client.get(
+                self.INDEX_URL, {'cursor': cursor})
+            page_obj = response.context['page_obj']
+            ids.extend(post.id for post in page_obj)
+            if not page_obj.has_next():
+                return ids, page_obj
+            cursor = page_obj.next_cursor
+
+    def test_cursor_pages_cover_feed_in_order(self):
+        ids, last_page = self.walk_forward()
+        self.assertEqual(ids, self.expected)
+        self.assertIsInstance(last_page, CursorPage)
+        self.assertTrue(last_page.has_previous())
+
+    def test_prev_cursor_returns_previous_page(self):
+        first = self.guest_client.get(self.INDEX_URL, {'cursor': ''})
+        second = self.guest_client.get(
+            self.INDEX_URL,
+            {'cursor': first.context['page_obj'].next_cursor}
+        )
+        back = self.guest_client.get(
+            self.INDEX_URL,
+            {'cursor': second.context['page_obj'].prev_cursor}
+        )
+        self.assertEqual(
+            [post.id for post in back.context['page_obj']],
+            self.expected[:settings.POST_LIMIT]
+        )
+        self.assertFalse(back.context['page_obj'].has_previous())
+
+    def test_broken_cursor_falls_back_to_first_page(self):
+        self.assertIsNone(decode_cursor('not-a-cursor'))
+        response = self.guest_client.get(
+            self.INDEX_URL, {'cursor': 'not-a-cursor'})
+        self.assertEqual(
+            [post.id for post in response.context['page_obj']],
+            self.expected[:settings.POST_LIMIT]
+        )
+
+    def test_cursor_page_runs_single_query_without_count(self):
+        response = self.guest_client.get(self.INDEX_URL, {'cursor': ''})
+        cursor = response.context['page_obj'].next_cursor
+        with self.assertNumQueries(1):
+            self.guest_client.get(self.INDEX_URL, {'cursor': cursor})
+
+    @override_settings(POST_PAGINATION='cursor')
+    def test_page_urls_keep_working_in_cursor_mode(self):
+        response = self.guest_client.get(self.INDEX_URL, {'page': 2})
+        self.assertEqual(response.context['page_obj'].number, 2)
+        response = self.guest_client.get(self.INDEX_URL)
+        self.assertIsInstance(response.context['page_obj'], CursorPage)
@@ -0,0 +1,89 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.queries import QueryRecorder
+from core.testing import QueryBudgetTestMixin
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+RANGE_POSTS = 15
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Пост {num}', author=cls.user, group=cls.group)
+            for num in range(RANGE_POSTS)
+        )
+        cls.post = Post.objects.first()
+
+    def setUp(self):
+        # Холодный кэш карточек: шаблоны обращаются к автору и группе.
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_views_stay_within_query_budget(self):
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': 'auth'}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+            reverse('posts:post_create'),
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            reverse('posts:search') + '?q=Пост',
+            reverse('posts:follow_index'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertWithinQueryBudget(self.authorized_client, url)
+
+    def test_post_requests_stay_within_query_budget(self):
+        other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other_slug',
+            description='Другое описание',
+        )
+        edit_url = reverse('posts:post_edit', kwargs={'post_id': self.post.pk})
+        requests = (
+            (reverse('posts:post_create'), self.group),
+            (edit_url, self.group),
+            # Перенос в другую группу меняет счётчики обеих групп.
+            (edit_url, other_group),
+        )
+        for url, group in requests:
+            with self.subTest(url=url, group=group.slug):
+                response = self.assertWithinQueryBudget(
+                    self.authorized_client, url,
+                    {'text': 'Новый текст', 'group': group.pk},
+                    method='POST',
+                )
+                self.assertEqual(response.status_code, 302)
+
+    def test_recorder_flags_n_plus_one_with_location(self):
+        recorder = QueryRecorder()
+        with recorder.record():
+            for post in Post.objects.all()[:5]:
+                post.group.title
+        repeated = recorder.repeated()
+        self.assertEqual(len(repeated), 1)
+        locations = {
+            query.location for queries in repeated.values()
+            for query in queries
+        }
+        self.assertTrue(all(
+            location.startswith('posts/tests/test_query_budgets.py')
+            for location in locations
+        ))
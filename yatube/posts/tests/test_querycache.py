@@ -0,0 +1,108 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from core.metrics import exposition
+
+from ..caching import get_versions, version_key
+from ..models import Group, Post, PostCounter
+from ..querycache import read_tables, stats, track_writes
+
+User = get_user_model()
+
+
+@override_settings(POST_QUERY_CACHE=True)
+class QueryCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        stats.reset()
+
+    def group_page(self):
+        return list(Post.objects.filter(group=self.group).select_related(
+            'author', 'group').cached(60)[:10])
+
+    def test_repeated_queryset_is_served_from_cache(self):
+        with self.assertNumQueries(1):
+            first = self.group_page()
+        with self.assertNumQueries(0):
+            second = self.group_page()
+
+        self.assertEqual(first, second)
+        self.assertEqual(second[0].author.username, 'auth')
+        self.assertEqual((stats.hits, stats.misses), (1, 1))
+
+    def test_writes_to_read_tables_expire_results(self):
+        writes = (
+            lambda: Post.objects.create(author=self.user, text='Ещё'),
+            lambda: Group.objects.filter(pk=self.group.pk).update(
+                title='Новое имя'),
+            lambda: User.objects.filter(pk=self.user.pk).update(
+                first_name='Лев'),
+        )
+        for write in writes:
+            with self.subTest(write=write):
+                self.group_page()
+                write()
+                with self.assertNumQueries(1):
+                    self.group_page()
+
+    def test_writes_to_other_tables_keep_results(self):
+        self.group_page()
+
+        PostCounter.objects.change(PostCounter.ALL, 0, 1)
+
+        with self.assertNumQueries(0):
+            self.group_page()
+
+    def test_values_queries_are_cached_separately(self):
+        posts = Post.objects.filter(pk=self.post.pk).cached(60)
+        self.assertEqual(list(posts), [self.post])
+        self.assertEqual(
+            list(posts.values_list('text', flat=True)), ['Пост'])
+
+    def test_read_tables_include_subqueries(self):
+        queryset = Post.objects.filter(
+            author__in=User.objects.filter(username='auth'))
+        sql, _ = queryset.query.sql_with_params()
+
+        self.assertEqual(read_tables(sql), ['auth_user', 'posts_post'])
+
+    def test_stats_exported_to_metrics(self):
+        self.group_page()
+        self.group_page()
+
+        text = exposition({})
+
+        self.assertIn(
+            'yatube_query_cache_requests_total{result="hit"} 1', text)
+        self.assertIn(
+            'yatube_query_cache_requests_total{result="miss"} 1', text)
+
+    @override_settings(POST_QUERY_CACHE=False)
+    def test_disabled_without_shared_cache(self):
+        self.assertNotIn(track_writes, connection.execute_wrappers)
+        self.group_page()
+
+        with self.assertNumQueries(1):
+            self.group_page()
+
+
+@override_settings(POST_QUERY_CACHE=True)
+class QueryCacheCommitTests(TransactionTestCase):
+    def test_tables_bumped_again_on_commit(self):
+        user = User.objects.create_user(username='auth')
+        key = version_key('table', 'posts_post')
+        with transaction.atomic():
+            Post.objects.create(author=user, text='Пост')
+            inside = get_versions([key])[key]
+
+        self.assertNotEqual(get_versions([key])[key], inside)
@@ -0,0 +1,132 @@
+from io import StringIO
+
+from django.contrib.admin.sites import site
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import (
+    Client, RequestFactory, TestCase, TransactionTestCase)
+from django.urls import reverse
+
+from ..models import Post
+from ..search import FTS_TABLE, fts_available, ranked_ids
+
+User = get_user_model()
+
+
+class PostSearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.SEARCH_URL = reverse('posts:search')
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.once = Post.objects.create(
+            text='Граф пишет дневник', author=self.user)
+        self.twice = Post.objects.create(
+            text='Дневник, опять дневник', author=self.user)
+        self.other = Post.objects.create(
+            text='Про охоту', author=self.user)
+
+    def search_ids(self, query):
+        return [pk for pk, _ in ranked_ids(query)]
+
+    def test_fts_index_is_available(self):
+        self.assertTrue(fts_available())
+
+    def test_results_are_ranked(self):
+        self.assertEqual(
+            self.search_ids('дневник'), [self.twice.pk, self.once.pk])
+
+    def test_index_follows_update_and_delete(self):
+        self.other.text = 'Охота и дневник'
+        self.other.save()
+        self.once.delete()
+        self.assertCountEqual(
+            self.search_ids('дневник'), [self.twice.pk, self.other.pk])
+        self.assertEqual(self.search_ids('охоту'), [])
+
+    def test_bulk_created_posts_are_indexed(self):
+        Post.objects.bulk_create(
+            Post(text=f'Запись номер {num}', author=self.user)
+            for num in range(3)
+        )
+        self.assertEqual(len(self.search_ids('запись')), 3)
+
+    def test_search_view_pages_with_cursor(self):
+        Post.objects.bulk_create(
+            Post(text=f'Дневник {num}', author=self.user)
+            for num in range(15)
+        )
+        response = self.guest_client.get(self.SEARCH_URL, {'q': 'дневник'})
+        first = list(response.context['page_obj'])
+        self.assertEqual(first[0], self.twice)
+        cursor = response.context['page_obj'].next_cursor
+        response = self.guest_client.get(
+            self.SEARCH_URL, {'q': 'дневник', 'cursor': cursor})
+        second = list(response.context['page_obj'])
+        self.assertEqual(len(first) + len(second), 17)
+        self.assertFalse(set(first) & set(second))
+
+    def test_special_characters_do_not_break_search(self):
+        response = self.guest_client.get(
+            self.SEARCH_URL, {'q': '"дневник AND (OR'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_admin_search_uses_fts(self):
+        admin_model = site._registry[Post]
+        request = RequestFactory().get('/admin/posts/post/')
+        queryset, use_distinct = admin_model.get_search_results(
+            request, Post.objects.all(), 'дневник')
+        self.assertFalse(use_distinct)
+        self.assertIn(FTS_TABLE, str(queryset.query))
+        self.assertCountEqual(queryset, [self.once, self.twice])
+
+    def test_backfill_command_indexes_existing_rows(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        call_command('index_posts_fts', batch_size=2, stdout=StringIO())
+        self.assertEqual(
+            self.search_ids('дневник'), [self.twice.pk, self.once.pk])
+
+
+class FtsTriggerMigrationTests(TransactionTestCase):
+    """Перестройка posts_post в миграции не должна терять триггеры FTS."""
+
+    FTS_MIGRATION = '0005_post_fts'
+    TRIGGERS = {
+        f'{FTS_TABLE}_insert', f'{FTS_TABLE}_update', f'{FTS_TABLE}_delete'}
+
+    def triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+                "AND tbl_name = 'posts_post'")
+            return {name for name, in cursor.fetchall()}
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.migrate([target])
+
+    def test_triggers_survive_every_migration_both_ways(self):
+        self.assertEqual(self.triggers(), self.TRIGGERS)
+        loader = MigrationExecutor(connection).loader
+        leaf, = loader.graph.leaf_nodes('posts')
+        plan = loader.graph.forwards_plan(leaf)
+        names = [
+            name for app, name in plan
+            if app == 'posts' and name > self.FTS_MIGRATION
+        ]
+        self.addCleanup(self.migrate, leaf)
+        self.migrate(('posts', self.FTS_MIGRATION))
+        for name in names:
+            with self.subTest(migrate='вперёд', to=name):
+                self.migrate(('posts', name))
+                self.assertEqual(self.triggers(), self.TRIGGERS)
+        for name in reversed([self.FTS_MIGRATION] + names[:-1]):
+            with self.subTest(migrate='назад', to=name):
+                self.migrate(('posts', name))
+                self.assertEqual(self.triggers(), self.TRIGGERS)
@@ -0,0 +1,174 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import Future
+from io import BytesIO
+from unittest import mock
+
+from PIL import Image
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings)
+from django.urls import reverse
+
+from ..models import Post
+from ..thumbnails import (
+    generate_thumbnails, thumbnail_name, thumbnails_ready)
+
+User = get_user_model()
+
+SIZES = {'card': (40, 20, True), 'detail': (30, 30, False)}
+
+
+def image_file(name='photo.png', size=(80, 60)):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/png')
+
+
+class MediaRootMixin:
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=media_root, THUMBNAIL_SIZES=SIZES)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.media_root = media_root
+        self.user = User.objects.create_user(username='auth')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def thumbnail_size(self, post, alias):
+        path = os.path.join(
+            self.media_root, thumbnail_name(post.image.name, alias))
+        with Image.open(path) as thumbnail:
+            return thumbnail.size
+
+
+@override_settings(THUMBNAIL_WORKERS=0)
+class ThumbnailUploadTests(MediaRootMixin, TransactionTestCase):
+    def test_create_post_with_image_renders_thumbnails(self):
+        response = self.client.post(reverse('posts:post_create'), {
+            'text': 'С картинкой',
+            'image': image_file(),
+        })
+
+        self.assertEqual(response.status_code, 302)
+        post = Post.objects.get()
+        self.assertEqual(post.image.name, 'posts/photo.png')
+        self.assertTrue(thumbnails_ready(post.image.name))
+        self.assertEqual(self.thumbnail_size(post, 'card'), (40, 20))
+        self.assertEqual(self.thumbnail_size(post, 'detail'), (30, 23))
+
+    def test_card_shows_thumbnail_once_ready(self):
+        self.client.post(reverse('posts:post_create'), {
+            'text': 'С картинкой',
+            'image': image_file(),
+        })
+
+        response = self.client.get(reverse('posts:index'))
+
+        self.assertContains(response, '/media/thumbs/card/posts/photo.jpg')
+
+    def test_edit_replaces_image(self):
+        post = Post.objects.create(author=self.user, text='Без картинки')
+
+        self.client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            {'text': 'Теперь с картинкой', 'image': image_file('new.png')},
+        )
+
+        post.refresh_from_db()
+        self.assertEqual(post.image.name, 'posts/new.png')
+        self.assertTrue(thumbnails_ready(post.image.name))
+
+    def assertImageDeleted(self, image_name):
+        names = [image_name] + [
+            thumbnail_name(image_name, alias) for alias in SIZES]
+        for name in names:
+            with self.subTest(name=name):
+                self.assertFalse(
+                    os.path.exists(os.path.join(self.media_root, name)))
+
+    def test_replaced_and_cleared_images_are_deleted(self):
+        self.client.post(reverse('posts:post_create'), {
+            'text': 'С картинкой',
+            'image': image_file('old.png'),
+        })
+        post = Post.objects.get()
+        url = reverse('posts:post_edit', kwargs={'post_id': post.pk})
+
+        self.client.post(
+            url, {'text': 'Новая картинка', 'image': image_file('new.png')})
+        self.assertImageDeleted('posts/old.png')
+        self.assertTrue(thumbnails_ready('posts/new.png'))
+
+        self.client.post(url, {'text': 'Без картинки', 'image-clear': 'on'})
+        post.refresh_from_db()
+        self.assertFalse(post.image)
+        self.assertImageDeleted('posts/new.png')
+
+    def test_deleted_post_image_is_deleted(self):
+        post = Post.objects.create(
+            author=self.user, text='С картинкой', image=image_file())
+        self.assertTrue(thumbnails_ready(post.image.name))
+
+        post.delete()
+
+        self.assertImageDeleted('posts/photo.png')
+
+
+class ThumbnailTests(MediaRootMixin, TestCase):
+    def test_card_falls_back_to_original_until_ready(self):
+        # В TestCase on_commit не срабатывает: нарезка так и не началась.
+        post = Post.objects.create(
+            author=self.user, text='С картинкой', image=image_file())
+
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}))
+
+        self.assertFalse(thumbnails_ready(post.image.name))
+        self.assertContains(response, '/media/posts/photo.png')
+
+    @override_settings(THUMBNAIL_WORKERS=1)
+    def test_thumbnails_render_in_process_pool(self):
+        post = Post.objects.create(
+            author=self.user, text='С картинкой', image=image_file())
+        done = []
+
+        future = generate_thumbnails(post, done.append)
+        future.result(timeout=30)
+
+        self.assertTrue(thumbnails_ready(post.image.name))
+        self.assertEqual(self.thumbnail_size(post, 'card'), (40, 20))
+
+    def test_worker_failure_is_logged(self):
+        post = Post.objects.create(
+            author=self.user, text='С картинкой', image=image_file())
+        failed = Future()
+        failed.set_exception(OSError('No space left on device'))
+        pool = mock.Mock(**{'submit.return_value': failed})
+        done = []
+
+        with override_settings(THUMBNAIL_WORKERS=1), mock.patch(
+            'posts.thumbnails.get_pool', return_value=pool
+        ), self.assertLogs('posts.thumbnails', 'ERROR') as logs:
+            generate_thumbnails(post, done.append)
+
+        self.assertIn('No space left on device', logs.output[0])
+        self.assertEqual(done, [])
+
+    def test_rejects_non_image_upload(self):
+        response = self.client.post(reverse('posts:post_create'), {
+            'text': 'С картинкой',
+            'image': SimpleUploadedFile(
+                'photo.png', b'not an image', 'image/png'),
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['image_form'].errors)
+        self.assertFalse(Post.objects.exists())
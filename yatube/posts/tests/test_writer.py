@@ -0,0 +1,78 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from ..models import Post, PostCounter
+from ..writer import PostWriteQueue, stop_write_queue
+
+User = get_user_model()
+
+RANGE_POSTS = 10
+
+
+class PostWriteQueueTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='auth')
+        self.writer = PostWriteQueue(batch_size=50, delay=0.05)
+        self.addCleanup(self.writer.stop)
+
+    def submit_concurrently(self, posts):
+        futures = [None] * len(posts)
+
+        def submit(index):
+            futures[index] = self.writer.submit(posts[index])
+
+        threads = [
+            threading.Thread(target=submit, args=(index,))
+            for index in range(len(posts))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return futures
+
+    def test_concurrent_posts_share_commits_and_get_own_pks(self):
+        posts = [
+            Post(text=f'Пост {num}', author=self.user)
+            for num in range(RANGE_POSTS)
+        ]
+        futures = self.submit_concurrently(posts)
+        pks = [future.result(5) for future in futures]
+        self.assertEqual(len(set(pks)), RANGE_POSTS)
+        self.assertEqual([post.pk for post in posts], pks)
+        self.assertLess(self.writer.batches, RANGE_POSTS)
+        self.assertEqual(PostCounter.objects.total(), RANGE_POSTS)
+
+    def test_failed_post_does_not_sink_its_batch(self):
+        good = Post(text='Нормальный пост', author=self.user)
+        broken = Post(text='Пост без автора', author_id=self.user.pk + 100)
+        futures = self.submit_concurrently([good, broken])
+        self.assertEqual(futures[0].result(5), good.pk)
+        with self.assertRaises(IntegrityError):
+            futures[1].result(5)
+        self.assertEqual(
+            list(Post.objects.values_list('text', flat=True)),
+            ['Нормальный пост']
+        )
+
+
+@override_settings(POST_WRITE_BATCHING=True)
+class BatchedPostCreateViewTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='auth')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.addCleanup(stop_write_queue)
+
+    def test_post_create_redirects_after_commit(self):
+        response = self.authorized_client.post(
+            reverse('posts:post_create'), data={'text': 'Через очередь'})
+        self.assertRedirects(
+            response,
+            reverse('posts:profile', kwargs={'username': 'auth'})
+        )
+        self.assertTrue(Post.objects.filter(text='Через очередь').exists())
@@ -0,0 +1,124 @@
+"""Миниатюры картинок постов, нарезанные заранее в пуле процессов.
+
+После сохранения поста с картинкой все размеры из THUMBNAIL_SIZES
+режутся в ProcessPoolExecutor: Pillow держит GIL, и в потоках нарезка
+тормозила бы обработку запросов. Шаблоны только проверяют, готов ли
+файл, и до тех пор показывают оригинал — рендер ленты не ждёт нарезки.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+THUMBNAILS_DIR = 'thumbs'
+
+logger = logging.getLogger('posts.thumbnails')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def thumbnail_name(image_name, alias):
+    stem, _ = os.path.splitext(image_name)
+    return f'{THUMBNAILS_DIR}/{alias}/{stem}.jpg'
+
+
+def render_thumbnails(source, targets):
+    """Режет миниатюры; выполняется в дочернем процессе без Django.
+
+    targets — список (путь, ширина, высота, обрезать ли по размеру).
+    Файл пишется под временным именем и переименовывается, чтобы
+    шаблон никогда не увидел недописанную миниатюру.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        for path, width, height, crop in targets:
+            if crop:
+                thumbnail = ImageOps.fit(image, (width, height))
+            else:
+                thumbnail = image.copy()
+                thumbnail.thumbnail((width, height))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            partial = f'{path}.part'
+            thumbnail.save(partial, 'JPEG', quality=85, optimize=True)
+            os.replace(partial, path)
+    return [path for path, *_ in targets]
+
+
+def thumbnail_targets(image_name):
+    return [
+        (default_storage.path(thumbnail_name(image_name, alias)), *size)
+        for alias, size in settings.THUMBNAIL_SIZES.items()
+    ]
+
+
+def thumbnails_ready(image_name):
+    return all(
+        os.path.exists(path) for path, *_ in thumbnail_targets(image_name))
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(settings.THUMBNAIL_WORKERS)
+        return _pool
+
+
+def generate_thumbnails(post, on_done=None):
+    """Запускает нарезку; при THUMBNAIL_WORKERS = 0 — прямо здесь."""
+    source = default_storage.path(post.image.name)
+    targets = thumbnail_targets(post.image.name)
+    if not settings.THUMBNAIL_WORKERS:
+        render_thumbnails(source, targets)
+        if on_done is not None:
+            on_done(post.pk)
+        return None
+    future = get_pool().submit(render_thumbnails, source, targets)
+    pk = post.pk
+
+    def done(future):
+        error = future.exception()
+        if error is not None:
+            # Пост остаётся с оригиналом; причина — в логе.
+            logger.error(
+                'Не удалось нарезать миниатюры поста %s: %r', pk, error,
+                exc_info=error)
+        elif on_done is not None:
+            on_done(pk)
+
+    future.add_done_callback(done)
+    return future
+
+
+def schedule_thumbnails(post, on_done=None):
+    """Нарезка после коммита: воркер должен увидеть файл и запись."""
+    transaction.on_commit(lambda: generate_thumbnails(post, on_done))
+
+
+def delete_image(image_name):
+    """Удаляет оригинал картинки и все его миниатюры."""
+    for name in [image_name] + [
+        thumbnail_name(image_name, alias)
+        for alias in settings.THUMBNAIL_SIZES
+    ]:
+        default_storage.delete(name)
+
+
+def schedule_delete(image_name):
+    """Удаление после коммита: при откате пост ещё ссылается на файл."""
+    transaction.on_commit(lambda: delete_image(image_name))
+
+
+def thumbnail_url(image, alias):
+    """URL миниатюры для шаблона или оригинала, пока она не готова."""
+    name = thumbnail_name(image.name, alias)
+    if default_storage.exists(name):
+        return default_storage.url(name)
+    return image.url
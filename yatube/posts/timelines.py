@@ -0,0 +1,195 @@
+"""Лента подписок с раскладкой при записи (fan-out on write).
+
+Новый пост после коммита записывается в TimelineEntry каждого
+подписчика, и страница ленты — один диапазон индекса (user, pub_date,
+post). Раскладка идёт пачками по FANOUT_BATCH_SIZE, каждая в своей
+транзакции, и не держит блокировку записи вместе с самим постом. Посты
+авторов, у которых подписчиков не меньше TIMELINE_FANOUT_LIMIT, не
+раскладываются: их подмешивают при чтении, иначе один пост такого
+автора превращался бы в миллион вставок.
+"""
+import heapq
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Q
+
+from .models import Follow, Post, PostCounter, TimelineEntry
+from .paginators import CURSOR_NEXT, CursorPage, decode_cursor, encode_cursor
+
+FANOUT_BATCH_SIZE = 500
+
+
+def is_merged_on_read(author_id):
+    return (
+        PostCounter.objects.followers(author_id)
+        >= settings.TIMELINE_FANOUT_LIMIT
+    )
+
+
+def timeline_entries(post, user_ids):
+    return [
+        TimelineEntry(
+            user_id=user_id,
+            post_id=post.pk,
+            author_id=post.author_id,
+            pub_date=post.pub_date,
+        )
+        for user_id in user_ids
+    ]
+
+
+def fan_out(post):
+    """Кладёт новый пост в ленты подписчиков автора."""
+    if is_merged_on_read(post.author_id):
+        return
+    # Подписчиков здесь меньше TIMELINE_FANOUT_LIMIT — список влезает.
+    followers = list(Follow.objects.filter(
+        author_id=post.author_id).values_list('user_id', flat=True))
+    for start in range(0, len(followers), FANOUT_BATCH_SIZE):
+        push(post, followers[start:start + FANOUT_BATCH_SIZE])
+
+
+def schedule_fan_out(post):
+    """Раскладка после коммита: пост уже виден, блокировка снята."""
+    transaction.on_commit(lambda: fan_out(post))
+
+
+def push(post, user_ids):
+    TimelineEntry.objects.bulk_create(
+        timeline_entries(post, user_ids), ignore_conflicts=True)
+    # Обрезка амортизирована: ленты подписчиков обрезаются на каждом
+    # TIMELINE_TRIM_EVERY-м посте сайта (по pk), а не на каждом посте.
+    if post.pk % settings.TIMELINE_TRIM_EVERY == 0:
+        trim_many(user_ids)
+
+
+TRIM_SQL = """
+    DELETE FROM {table} WHERE id IN (
+        SELECT id FROM (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY user_id ORDER BY pub_date DESC, post_id DESC
+            ) AS position
+            FROM {table} WHERE user_id IN ({users})
+        ) ranked WHERE position > %s
+    )
+"""
+
+
+def trim_many(user_ids):
+    """Обрезает ленты пачки подписчиков одним DELETE.
+
+    Без оконных функций (SQLite до 3.25) — по ленте на подписчика.
+    """
+    user_ids = list(user_ids)
+    connection = connections[router.db_for_write(TimelineEntry)]
+    if not connection.features.supports_over_clause:
+        for user_id in user_ids:
+            trim(user_id)
+        return
+    sql = TRIM_SQL.format(
+        table=connection.ops.quote_name(TimelineEntry._meta.db_table),
+        users=', '.join(['%s'] * len(user_ids)),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*user_ids, settings.TIMELINE_LENGTH])
+
+
+def trim(user_id):
+    """Оставляет в ленте только TIMELINE_LENGTH свежих записей."""
+    length = settings.TIMELINE_LENGTH
+    cutoff = list(
+        TimelineEntry.objects.filter(user_id=user_id).order_by(
+            '-pub_date', '-post_id'
+        ).values_list('pub_date', 'post_id')[length:length + 1]
+    )
+    if cutoff:
+        pub_date, post_id = cutoff[0]
+        TimelineEntry.objects.filter(
+            Q(pub_date__lt=pub_date)
+            | Q(pub_date=pub_date, post_id__lte=post_id),
+            user_id=user_id,
+        ).delete()
+
+
+def backfill(user_id, author_id):
+    """После подписки переносит в ленту последние посты автора."""
+    if is_merged_on_read(author_id):
+        return
+    posts = Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date', '-id')[:settings.TIMELINE_LENGTH]
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(
+                user_id=user_id,
+                post_id=post.pk,
+                author_id=author_id,
+                pub_date=post.pub_date,
+            )
+            for post in posts.only('pk', 'pub_date')
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def forget(user_id, author_id):
+    TimelineEntry.objects.filter(
+        user_id=user_id, author_id=author_id).delete()
+
+
+def merged_authors(user_id):
+    """Авторы из подписок, чьи посты подмешиваются при чтении."""
+    return list(PostCounter.objects.filter(
+        scope=PostCounter.FOLLOWERS,
+        count__gte=settings.TIMELINE_FANOUT_LIMIT,
+        object_id__in=Follow.objects.filter(
+            user_id=user_id).values('author_id'),
+    ).values_list('object_id', flat=True))
+
+
+def after(position, date_field, id_field):
+    """Условие keyset «строго раньше курсора» для своей пары полей."""
+    _, pub_date, pk = position
+    return Q(**{f'{date_field}__lt': pub_date}) | Q(
+        **{date_field: pub_date, f'{id_field}__lt': pk})
+
+
+def timeline_page(user, cursor=None):
+    """Страница ленты подписок; листается только вперёд по курсору."""
+    limit = settings.POST_LIMIT + 1
+    position = decode_cursor(cursor) if cursor else None
+    if position is not None and position[0] != CURSOR_NEXT:
+        position = None
+    entries = TimelineEntry.objects.filter(user=user).select_related(
+        'post__author', 'post__group').order_by('-pub_date', '-post_id')
+    if position is not None:
+        entries = entries.filter(
+            after(position, 'pub_date', 'post_id'),
+            pub_date__lte=position[1],
+        )
+    streams = [[entry.post for entry in entries[:limit]]]
+    authors = merged_authors(user.pk)
+    if authors:
+        posts = Post.objects.filter(author_id__in=authors).select_related(
+            'author', 'group').order_by('-pub_date', '-id')
+        if position is not None:
+            posts = posts.filter(
+                after(position, 'pub_date', 'id'),
+                pub_date__lte=position[1],
+            )
+        streams.append(list(posts[:limit]))
+    rows, seen = [], set()
+    for post in heapq.merge(
+        *streams, key=lambda post: (post.pub_date, post.pk), reverse=True
+    ):
+        # Пост мог попасть в ленту до того, как автор стал «звездой».
+        if post.pk not in seen:
+            seen.add(post.pk)
+            rows.append(post)
+    has_next = len(rows) > settings.POST_LIMIT
+    rows = rows[:settings.POST_LIMIT]
+    next_cursor = None
+    if has_next:
+        next_cursor = encode_cursor(
+            CURSOR_NEXT, rows[-1].pub_date, rows[-1].pk)
+    return CursorPage(rows, None, next_cursor, None)
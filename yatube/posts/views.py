@@ -1,22 +1,39 @@
+from django.db import DatabaseError
+from django.http import Http404
 from django.shortcuts import get_object_or_404, render
-from . models import Group, Post, User
+from . models import Follow, Post, PostCounter
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect
-from . forms import PostForm
+from . forms import PostForm, PostImageForm
 from posts . paginators import paginate_page
+from . caching import (
+    cache_feed_page, conditional_pages, conditional_view, feed_name,
+    feed_page_state, get_versions, make_etag, version_key, version_time,
+    viewer_state)
+from . search import search_page
+from . exports import EXPORT_FORMATS, export_response
+from . writer import create_post
+from . timelines import timeline_page
+from . lookups import authors, groups
 
 
+@conditional_view(feed_page_state)
+@cache_feed_page
 def index(request):
     posts = Post.objects.select_related("group", "author")
-    paagination_data = paginate_page(request, posts)
+    paagination_data = paginate_page(
+        request, posts, PostCounter.objects.total)
     return render(
         request, "posts/index.html", {**paagination_data})
 
 
+@conditional_view(feed_page_state)
+@cache_feed_page
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all().select_related('author')
-    paagination_data = paginate_page(request, posts)
+    group = groups.get_or_404(slug)
+    posts = group.posts.select_related('author').cached()
+    paagination_data = paginate_page(
+        request, posts, lambda: PostCounter.objects.for_group(group))
     context = {
         'group': group,
         'posts': posts,
@@ -25,20 +42,83 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@conditional_view(feed_page_state)
+@cache_feed_page
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
-    paagination_data = paginate_page(request, post_list)
+    author = authors.get_or_404(username)
+    post_list = author.posts.select_related('group')
+    posts_count = PostCounter.objects.for_author(author)
+    paagination_data = paginate_page(request, post_list, posts_count)
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user, author=author).exists()
     context = {
         'author': author,
+        'posts_count': posts_count,
+        'following': following,
         **paagination_data
     }
     return render(request, 'posts/profile.html', context)
 
 
+def group_export(request, slug, fmt):
+    if fmt not in EXPORT_FORMATS:
+        raise Http404
+    group = groups.get_or_404(slug)
+    return export_response(group.posts.all(), fmt, f'group-{group.slug}')
+
+
+def profile_export(request, username, fmt):
+    if fmt not in EXPORT_FORMATS:
+        raise Http404
+    author = authors.get_or_404(username)
+    return export_response(
+        author.posts.all(), fmt, f'profile-{author.username}')
+
+
+def post_detail_state(request, post_id):
+    """Валидаторы поста: его updated и версии всего, что видно рядом."""
+    if not conditional_pages():
+        return None, None
+    row = Post.objects.filter(pk=post_id).values_list(
+        'updated', 'author_id', 'group_id', 'author__username').first()
+    if row is None:
+        return None, None
+    updated, author_id, group_id, username = row
+    keys = [
+        version_key('post', post_id),
+        version_key('author', author_id),
+        version_key('group', group_id),
+        # Лента автора меняется вместе с «Всего постов автора».
+        version_key('feed', feed_name('posts:profile', username)),
+    ]
+    versions = get_versions(keys)
+    etag = make_etag(
+        updated.timestamp(),
+        *[versions[key] for key in keys],
+        viewer_state(request)
+    )
+    last_modified = max(
+        [updated] + [version_time(versions[key]) for key in keys])
+    return etag, last_modified
+
+
+@conditional_view(post_detail_state)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    return render(request, 'posts/post_detail.html', {'post': post})
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), pk=post_id)
+    context = {
+        'post': post,
+        'posts_count': PostCounter.objects.for_author(post.author),
+    }
+    return render(request, 'posts/post_detail.html', context)
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    context = {'query': query}
+    if query:
+        context['page_obj'] = search_page(query, request.GET.get('cursor'))
+    return render(request, 'posts/search.html', context)
 
 
 @login_required
@@ -47,34 +127,74 @@ def post_create(request):
         request.POST or None,
         files=request.FILES or None
     )
-    if not form.is_valid():
-        return render(request, 'posts/create_post.html', {'form': form})
+    # Картинка — отдельная форма над тем же экземпляром поста.
+    image_form = PostImageForm(
+        request.POST or None,
+        files=request.FILES or None,
+        instance=form.instance
+    )
+    context = {'form': form, 'image_form': image_form}
+    if not all([form.is_valid(), image_form.is_valid()]):
+        return render(request, 'posts/create_post.html', context)
     temp_form = form.save(commit=False)
     temp_form.author = request.user
-    temp_form.save()
+    try:
+        create_post(temp_form)
+    except DatabaseError:
+        form.add_error(None, 'Не удалось сохранить пост, попробуйте ещё раз')
+        return render(request, 'posts/create_post.html', context)
     return redirect('posts:profile', temp_form.author)
 
 
 @login_required
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
-    if post.author != request.user:
+    if post.author_id != request.user.pk:
         return redirect(
             'posts:post_detail', post_id
         )
+    # Автор уже известен — обработчики сохранения не станут его читать.
+    post.author = request.user
     form = PostForm(
         request.POST or None,
         files=request.FILES or None,
         instance=post
     )
-    if form.is_valid():
+    image_form = PostImageForm(
+        request.POST or None,
+        files=request.FILES or None,
+        instance=post
+    )
+    if all([form.is_valid(), image_form.is_valid()]):
         form.save()
         return redirect(
             'posts:post_detail', post_id
         )
     context = {
         'form': form,
+        'image_form': image_form,
         'is_edit': True,
         'post': post
     }
     return render(request, 'posts/create_post.html', context)
+
+
+@login_required
+def follow_index(request):
+    page_obj = timeline_page(request.user, request.GET.get('cursor'))
+    return render(request, 'posts/follow.html', {'page_obj': page_obj})
+
+
+@login_required
+def profile_follow(request, username):
+    author = authors.get_or_404(username)
+    if author != request.user:
+        Follow.objects.get_or_create(user=request.user, author=author)
+    return redirect('posts:profile', username)
+
+
+@login_required
+def profile_unfollow(request, username):
+    author = authors.get_or_404(username)
+    Follow.objects.filter(user=request.user, author=author).delete()
+    return redirect('posts:profile', username)
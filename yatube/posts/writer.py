@@ -0,0 +1,162 @@
+"""Групповой коммит новых постов.
+
+Запросы post_create кладут посты в очередь. Поток-писатель собирает
+пачку за POST_WRITE_BATCH_DELAY секунд или до POST_WRITE_BATCH_SIZE
+постов и сохраняет её одной транзакцией: SQLite берёт лок записи и
+делает fsync один раз на пачку, а не на каждый пост. Каждый пост
+сохраняется обычным save() — pk и сигналы те же, что без очереди.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection
+from django.db import transaction
+
+from core.routers import mark_written
+
+logger = logging.getLogger('posts.writer')
+
+_STOP = object()
+
+
+def save_post(post):
+    """Сохраняет пост; ошибку возвращает, а не бросает."""
+    try:
+        post.save()
+    except Exception as error:
+        return error
+    return None
+
+
+def save_again(post):
+    # pk от откаченной пачки больше ничего не значит.
+    post.pk = None
+    post._state.adding = True
+    return save_post(post)
+
+
+class PostWriteQueue:
+    def __init__(self, batch_size, delay):
+        self.batch_size = batch_size
+        self.delay = delay
+        self.batches = 0
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(
+            target=self.run, name='post-writer', daemon=True)
+        self.thread.start()
+
+    def submit(self, post):
+        future = Future()
+        self.queue.put((post, future))
+        return future
+
+    def stop(self):
+        self.queue.put(_STOP)
+        self.thread.join()
+
+    def collect(self):
+        """Первый пост ждёт сколько угодно, остальные — до дедлайна."""
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.delay
+        while batch[-1] is not _STOP and len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        try:
+            while True:
+                batch = self.collect()
+                stopping = batch[-1] is _STOP
+                if stopping:
+                    batch.pop()
+                # Отменённые по таймауту запросы в пачку не попадают.
+                batch = [
+                    (post, future) for post, future in batch
+                    if future.set_running_or_notify_cancel()
+                ]
+                if batch:
+                    close_old_connections()
+                    self.write(batch)
+                if stopping:
+                    return
+        finally:
+            connection.close()
+
+    def write(self, batch):
+        try:
+            try:
+                with transaction.atomic():
+                    # save() поста — точка сохранения внутри пачки:
+                    # ошибка одного поста не откатывает остальные.
+                    errors = [save_post(post) for post, _ in batch]
+            except DatabaseError:
+                # Коммит пачки не прошёл, например из-за отложенного
+                # внешнего ключа. Сохраняем посты поодиночке, чтобы
+                # каждый запрос получил свой результат.
+                logger.warning(
+                    'Пачка из %s постов не записалась, пишем по одному',
+                    len(batch))
+                errors = [save_again(post) for post, _ in batch]
+            self.batches += 1
+        except Exception as error:
+            errors = [error] * len(batch)
+        for (post, future), error in zip(batch, errors):
+            if error is None:
+                future.set_result(post.pk)
+            else:
+                future.set_exception(error)
+
+
+_write_queue = None
+_write_queue_lock = threading.Lock()
+
+
+def get_write_queue():
+    global _write_queue
+    with _write_queue_lock:
+        if _write_queue is None:
+            _write_queue = PostWriteQueue(
+                settings.POST_WRITE_BATCH_SIZE,
+                settings.POST_WRITE_BATCH_DELAY,
+            )
+        return _write_queue
+
+
+def stop_write_queue():
+    global _write_queue
+    with _write_queue_lock:
+        if _write_queue is not None:
+            _write_queue.stop()
+            _write_queue = None
+
+
+def create_post(post):
+    """Сохраняет новый пост напрямую или через групповой коммит.
+
+    Возвращается только после того, как судьба поста известна: либо
+    у него есть pk, либо брошено исключение и поста в базе нет.
+    """
+    if not settings.POST_WRITE_BATCHING:
+        post.save()
+        return post
+    # Пишет другой поток, но закрепить за primary надо этот запрос.
+    mark_written()
+    future = get_write_queue().submit(post)
+    try:
+        future.result(settings.POST_WRITE_TIMEOUT)
+    except TimeoutError:
+        if future.cancel():
+            raise DatabaseError('Очередь записи не дошла до поста')
+        # Писатель уже взял пост в работу — дожидаемся итога.
+        future.result()
+    return post
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import sys
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -49,7 +50,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.StaticFilesMiddleware',
+    'core.middleware.QueryBudgetMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -63,7 +68,7 @@ ROOT_URLCONF = 'yatube.urls'
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backends.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -78,6 +83,21 @@ TEMPLATES = [
     },
 ]
 
+# Боевой режим шаблонов: кэширующий загрузчик и компиляция всех
+# шаблонов из templates/ при старте — шаблон с ошибкой роняет запуск,
+# а не первый запрос. По умолчанию включён, когда DEBUG выключен.
+TEMPLATE_PRECOMPILE = os.getenv(
+    'TEMPLATE_PRECOMPILE', '0' if DEBUG else '1') == '1'
+if TEMPLATE_PRECOMPILE:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [(
+        'django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]
+    )]
+    TEMPLATES[0]['OPTIONS']['precompile'] = True
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
 
@@ -91,6 +111,54 @@ DATABASES = {
     }
 }
 
+# Режим SQLite для продакшена (SQLITE_PRODUCTION=1): WAL, mmap, большой
+# кэш страниц, ожидание лока и повтор операторов, которые его не
+# дождались, постоянные соединения. Обслуживание WAL — команда
+# sqlite_maintenance, сравнение режимов — benchmark_sqlite.
+SQLITE_PRODUCTION_SETTINGS = {
+    'ENGINE': 'core.backends.sqlite3',
+    'OPTIONS': {'timeout': 5},
+    'CONN_MAX_AGE': 600,
+    'PRAGMAS': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,
+        'busy_timeout': 5000,
+        'temp_store': 'MEMORY',
+    },
+    'LOCK_RETRIES': 5,
+    'TRANSACTION_MODE': 'IMMEDIATE',
+}
+SQLITE_PRODUCTION = os.getenv('SQLITE_PRODUCTION') == '1'
+if SQLITE_PRODUCTION:
+    DATABASES['default'].update(SQLITE_PRODUCTION_SETTINGS)
+
+# Реплики только для чтения: пути к файлам SQLite через запятую.
+# Локально их заполняет python manage.py sync_replicas.
+DATABASE_REPLICAS = ()
+for number, path in enumerate(
+    filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')), start=1
+):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS += (alias,)
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+# GET этих view читают с реплики, остальное — только primary.
+DATABASE_REPLICA_VIEWS = (
+    'posts:index',
+    'posts:group_posts',
+    'posts:profile',
+    'posts:post_detail',
+    'posts:follow_index',
+)
+# Сколько секунд после записи пользователь читает только с primary.
+DATABASE_PIN_SECONDS = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -132,11 +200,177 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+
+# Сборка статики: collectstatic добавляет в имена хеш содержимого и
+# кладёт рядом копии .gz. По умолчанию включена, когда DEBUG выключен.
+STATIC_HASHED = os.getenv(
+    'STATIC_HASHED', '0' if DEBUG else '1') == '1'
+if STATIC_HASHED:
+    STATICFILES_STORAGE = (
+        'core.staticfiles.CompressedManifestStaticFilesStorage')
+
+# Отдавать собранную статику самим Django (StaticFilesMiddleware) с
+# вечным Cache-Control и готовыми .gz, если перед ним нет nginx.
+STATIC_SERVE = os.getenv(
+    'STATIC_SERVE', '0' if DEBUG else '1') == '1'
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Загрузки любого размера сразу пишутся во временный файл на диске,
+# а не копятся в памяти процесса.
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# Миниатюры картинок постов: (ширина, высота, обрезать ли по размеру).
+# Режутся заранее в THUMBNAIL_WORKERS процессах; 0 — прямо в запросе.
+THUMBNAIL_SIZES = {
+    'card': (960, 339, True),
+    'detail': (960, 960, False),
+}
+THUMBNAIL_WORKERS = int(os.getenv('THUMBNAIL_WORKERS', '2'))
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма из запросов ложатся в очередь в БД, а отправляет их команда
+# send_outbox через EMAIL_OUTBOX_BACKEND: пачками по одному
+# соединению, с повтором через EMAIL_OUTBOX_RETRY_DELAY · 2^n секунд.
+EMAIL_BACKEND = 'core.mail.OutboxEmailBackend'
+EMAIL_OUTBOX_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+EMAIL_OUTBOX_BATCH_SIZE = 50
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60
+# Сколько секунд взятая воркером пачка недоступна другим воркерам.
+EMAIL_OUTBOX_LEASE = 10 * 60
 
 POST_LIMIT = 10
+# 'offset' — нумерованные страницы (?page=N), 'cursor' — keyset (?cursor=)
+POST_PAGINATION = 'offset'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Общий для всех процессов кэш: адреса memcached через запятую. Кэши,
+# которые сбрасываются сигналами (сессии и пользователь, карточки
+# постов и страницы лент, поиск групп и авторов, результаты запросов,
+# ETag страниц), без него либо выключены, либо живут секунды:
+# LocMemCache у каждого процесса свой, и сигнал в одном процессе не
+# сбросит запись в остальных.
+SHARED_CACHE_LOCATION = os.getenv('SHARED_CACHE_LOCATION', '')
+SHARED_CACHE = bool(SHARED_CACHE_LOCATION)
+if SHARED_CACHE:
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': SHARED_CACHE_LOCATION.split(','),
+    }
+# Свой алиас у кэша поиска групп и авторов: отрицательные записи от
+# сканеров не вытесняют карточки и страницы из основного кэша.
+CACHES['lookups'] = {
+    **CACHES['default'],
+    'KEY_PREFIX': 'lookups',
+    'OPTIONS': {'MAX_ENTRIES': 10000},
+}
+if SHARED_CACHE:
+    CACHES['lookups'].pop('OPTIONS')
+
+# С общим кэшем сессии живут в нём с записью в БД и сохраняются, только
+# если изменились, а пользователь запроса тоже берётся из кэша.
+if SHARED_CACHE:
+    SESSION_ENGINE = 'core.sessions'
+    AUTHENTICATION_BACKENDS = ['core.auth.CachedModelBackend']
+USER_CACHE_TIMEOUT = 60 * 15
+
+# Сколько живёт отрендеренная карточка поста. С общим кэшем версия в
+# ключе обновляется сигналами, и таймаут лишь подчищает память; без
+# него другие процессы узнают о правке только по таймауту.
+POST_CARD_CACHE_TIMEOUT = 60 * 60 if SHARED_CACHE else 5
+
+# Страницы лент для анонимов; сигналы сбрасывают только затронутые
+# ленты, но без общего кэша — лишь в своём процессе, поэтому тогда
+# страница живёт секунды.
+FEED_PAGE_CACHE_TIMEOUT = 60 * 5 if SHARED_CACHE else 5
+
+# ETag и Last-Modified страниц лент и поста собираются из тех же версий
+# в кэше, что и ключи карточек. Без общего кэша версия, поднятая в одном
+# процессе, не видна остальным, и они отвечали бы 304 со старой
+# страницей — поэтому условные GET включаются только с SHARED_CACHE.
+CONDITIONAL_PAGES = SHARED_CACHE
+
+# Кэш поиска групп по slug и авторов по username: OBJECT_CACHE_SIZE
+# записей в LRU процесса, живущих OBJECT_CACHE_LOCAL_TIMEOUT секунд,
+# за ними кэш OBJECT_CACHE_ALIAS. Несуществующие имена помнятся меньше.
+# Без общего кэша другие процессы сигналов не видят, поэтому и второй
+# уровень живёт не дольше LRU.
+OBJECT_CACHE_ALIAS = 'lookups'
+OBJECT_CACHE_SIZE = 1000
+OBJECT_CACHE_LOCAL_TIMEOUT = 5
+OBJECT_CACHE_TIMEOUT = 60 * 60 if SHARED_CACHE else OBJECT_CACHE_LOCAL_TIMEOUT
+OBJECT_CACHE_MISSING_TIMEOUT = 60 if SHARED_CACHE else OBJECT_CACHE_LOCAL_TIMEOUT
+
+# Результаты Post.objects.cached(): сколько живут в кэше, если у
+# .cached() не указан ttl. Запись в таблицу сбрасывает их сразу, но
+# только через общий кэш — без него .cached() ничего не кэширует.
+POST_QUERY_CACHE = SHARED_CACHE
+POST_QUERY_CACHE_TIMEOUT = 60 * 5
+
+# Лента подписок: длина ленты пользователя и порог подписчиков, после
+# которого посты автора не раскладываются по лентам, а подмешиваются
+# при чтении. Ленты обрезаются на каждом TIMELINE_TRIM_EVERY-м посте
+# сайта (по pk).
+TIMELINE_LENGTH = 1000
+TIMELINE_FANOUT_LIMIT = 10000
+TIMELINE_TRIM_EVERY = 20
+
+# Групповой коммит post_create: посты копятся до POST_WRITE_BATCH_SIZE
+# штук или POST_WRITE_BATCH_DELAY секунд и пишутся одной транзакцией.
+POST_WRITE_BATCHING = False
+POST_WRITE_BATCH_SIZE = 50
+POST_WRITE_BATCH_DELAY = 0.005
+POST_WRITE_TIMEOUT = 10
+
+# Запись SQL каждого запроса: заголовок X-Query-Count, предупреждения
+# в логгер core.queries о N+1 и превышении QUERY_BUDGETS.
+QUERY_INSPECTION = DEBUG
+QUERY_N_PLUS_ONE_THRESHOLD = 3
+
+# Бюджеты считают все запросы авторизованного пользователя,
+# включая сессию и auth_user; тесты падают при превышении.
+QUERY_BUDGETS = {
+    'posts:index': 4,
+    'posts:group_posts': 5,
+    # Шестой запрос — подписан ли зритель на автора.
+    'posts:profile': 6,
+    # Один из запросов — валидаторы для 304, см. post_detail_state.
+    'posts:post_detail': 5,
+    # POST: валидация группы, запись, счётчики и после коммита два
+    # запроса раскладки по лентам подписчиков.
+    'posts:post_create': {'GET': 3, 'POST': 10},
+    # Перенос поста в другую группу: счётчики обеих групп и slug старой.
+    'posts:post_edit': {'GET': 4, 'POST': 11},
+    'posts:search': 5,
+    'posts:follow_index': 5,
+}
+
+# manage.py test или pytest.
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+# В тестах предупреждения core.queries только шумят: бюджеты и N+1
+# проверяет posts/tests/test_query_budgets.py.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'loggers': {
+        'core.queries': {'level': 'ERROR' if TESTING else 'WARNING'},
+    },
+}
+
+# Метрики по view в формате Prometheus на /metrics.
+METRICS_ENABLED = True
+METRICS_ALLOWED_IPS = ('127.0.0.1', '::1')